@@ -1,75 +1,191 @@
-from flask import Flask
+import importlib
+import logging
+import os
+import sqlite3
+
+import click
+import orjson
+from flask import Flask, g, has_request_context
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
+from flask_caching import Cache
 from config import Config
-from .template_filters import timesince
+from .json_provider import OrjsonProvider, json_column_serializer
+from .template_filters import timesince, strip_html
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
+cache = Cache()
+# Rascunhos do assistente: precisam ser vistos por todos os workers e
+# sobreviver a reinícios, então não usam o cache em memória
+wizard_cache = Cache()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 
-# Import models here to avoid circular imports
-from app.models.user import User
-from app.models.project import Project
-from app.models.execution import Execution, ExecutionLog, ExecutionStatus, ExecutionLogLevel
+# Default SQLite database at the project root, used unless DATABASE_URL
+# points to a non-PostgreSQL database
+_BASEDIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+_DEFAULT_SQLITE_URI = 'sqlite:///' + os.path.join(_BASEDIR, 'app.db')
+
+# Route modules and their URL prefixes, registered in this order; the
+# wizard/results/projects views are loaded lazily (see app/_lazy_bp.py)
+_BLUEPRINTS = (
+    ('app.routes.main', None),
+    ('app.routes.auth', '/auth'),
+    ('app.routes.execution', '/execution'),
+)
 
 def create_app(config_class=None):
     app = Flask(__name__)
-    if config_class is None:
-        from config import Config
-        config_class = Config
-    app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
+    app.config.from_object(config_class or Config)
+    
+    # Register template filters
+    app.jinja_env.filters['timesince'] = timesince
+    app.jinja_env.filters['strip_html'] = strip_html
     
     # Force SQLite database for development
-    import os
-    if 'DATABASE_URL' not in os.environ or 'postgresql' in os.environ.get('DATABASE_URL', ''):
-        basedir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'app.db')
+    if 'postgresql' in os.environ.get('DATABASE_URL', 'postgresql'):
+        app.config['SQLALCHEMY_DATABASE_URI'] = _DEFAULT_SQLITE_URI
+    
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'query_cache_size': 1200,
+            'pool_pre_ping': False,
+            'connect_args': {'check_same_thread': False}
+        }
+    else:
+        # Pool dimensionado para workers Celery e gunicorn em paralelo
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'query_cache_size': 1200,
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': 30,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        }
+    
+    # Colunas JSON (settings, content, metadata) codificadas com orjson
+    engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    engine_options.setdefault('json_serializer', json_column_serializer)
+    engine_options.setdefault('json_deserializer', orjson.loads)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        # Só o engine da aplicação; engines criados à parte (init_db.py,
+        # Alembic, testes) ficam com os padrões do SQLite
+        if not event.contains(db.engine, 'connect', _set_sqlite_pragmas):
+            event.listen(db.engine, 'connect', _set_sqlite_pragmas)
+    _load_models()
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    cache.init_app(app)
+    wizard_cache.init_app(app, config=_wizard_cache_config(app))
     
     # Register blueprints
-    from app.routes.main import bp as main_bp
-    from app.routes.auth import bp as auth_bp
-    from app.routes.wizard import bp as wizard_bp
-    from app.routes.execution import bp as execution_bp
-    from app.routes.results import bp as results_bp
-    from app.routes.projects import bp as projects_bp
+    for modname, prefix in _BLUEPRINTS:
+        mod = importlib.import_module(modname)
+        app.register_blueprint(mod.bp, **({'url_prefix': prefix} if prefix else {}))
     
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp, url_prefix='/auth')
-    app.register_blueprint(wizard_bp, url_prefix='/wizard')
-    app.register_blueprint(execution_bp, url_prefix='/execution')
-    app.register_blueprint(results_bp, url_prefix='/project')
-    app.register_blueprint(projects_bp, url_prefix='/projects')
+    from app._lazy_bp import LAZY_BLUEPRINTS
+    for lazy_bp in LAZY_BLUEPRINTS:
+        app.register_blueprint(lazy_bp)
     
-    # Register template filters
-    app.jinja_env.filters['timesince'] = timesince
+    # Development-only query diagnostics
+    if app.config.get('DEBUG'):
+        _init_nplusone(app)
+    if app.config.get('SQL_PROFILE'):
+        _init_sql_profiler(app)
     
-    # Initialize database tables
-    with app.app_context():
-        # This will create the database file using SQLite
-        db.create_all()
-        
-        # Create admin user if not exists
-        from werkzeug.security import generate_password_hash
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
-            admin = User(
-                username='admin',
-                email='admin@example.com',
-                is_admin=True
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database tables and the default admin user."""
+        _bootstrap_database()
+        click.echo('Database initialized.')
     
     return app
 
-from app import models  # noqa
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection of the app engine (WAL, relaxed fsync, in-memory temp tables)"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+def _init_nplusone(app):
+    """Log lazy loads that look like N+1 queries, when nplusone is installed"""
+    try:
+        from nplusone.ext.flask_sqlalchemy import NPlusOne
+    except ImportError:
+        return
+    app.config.setdefault('NPLUSONE_LOGGER', app.logger)
+    app.config.setdefault('NPLUSONE_LOG_LEVEL', logging.WARNING)
+    NPlusOne(app)
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count statements issued while handling a profiled request"""
+    if has_request_context() and '_sql_queries' in g:
+        g._sql_queries += 1
+
+def _init_sql_profiler(app):
+    """Report the number of SQL statements per request in an X-SQL-Queries header"""
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+    
+    @app.before_request
+    def _start_query_count():
+        g._sql_queries = 0
+    
+    @app.after_request
+    def _emit_query_count(response):
+        response.headers['X-SQL-Queries'] = str(g.get('_sql_queries', 0))
+        return response
+
+def _wizard_cache_config(app):
+    """Shared store for wizard drafts: Redis when REDIS_URL is set, otherwise files under instance/"""
+    redis_url = app.config.get('REDIS_URL') or os.environ.get('REDIS_URL')
+    if redis_url:
+        return {'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_URL': redis_url,
+                'CACHE_KEY_PREFIX': 'autonowrite:'}
+    return {'CACHE_TYPE': 'FileSystemCache', 'CACHE_THRESHOLD': 10000,
+            'CACHE_DIR': app.config.get('WIZARD_CACHE_DIR') or os.path.join(app.instance_path, 'wizard_cache')}
+
+def _load_models():
+    """Import the model modules so their tables register on db.metadata"""
+    # Imported here to avoid circular imports and to keep `import app` cheap
+    from app.models import user, project, execution  # noqa
+
+def _bootstrap_database():
+    """Create all tables and seed the admin user if it does not exist yet"""
+    # This will create the database file using SQLite
+    db.create_all()
+    
+    # The tables now match the latest migration; record that so a later
+    # `flask db upgrade` does not try to create them again
+    from flask_migrate import stamp
+    stamp()
+    
+    # Create admin user if not exists
+    from app.models.user import User
+    admin_id = db.session.execute(select(User.id).where(User.username == 'admin')).scalar()
+    if admin_id is None:
+        admin = User(
+            username='admin',
+            email='admin@example.com',
+            is_admin=True
+        )
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
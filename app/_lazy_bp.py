@@ -0,0 +1,57 @@
+from flask import Blueprint
+from werkzeug.utils import cached_property, import_string
+
+class LazyView:
+    """Stand-in view function that imports the real view on its first call"""
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+class LazyBlueprint(Blueprint):
+    """Blueprint whose views module is only imported when one of its endpoints is hit.
+
+    The URL rules are declared up front with :meth:`lazy_route` so that
+    ``url_for`` keeps working before the views module has been imported.
+    """
+    def __init__(self, name, views_module, **kwargs):
+        super().__init__(name, views_module, **kwargs)
+        self.views_module = views_module
+        self._lazy_views = {}
+
+    def lazy_route(self, rule, view_name, **options):
+        # One LazyView per endpoint, Flask refuses to remap an endpoint
+        # to a different function object
+        view = self._lazy_views.get(view_name)
+        if view is None:
+            view = self._lazy_views[view_name] = LazyView(f'{self.views_module}.{view_name}')
+        self.add_url_rule(rule, view_name, view, **options)
+
+# Lazily loaded blueprints: their views are rarely hit compared to main/auth
+
+wizard_bp = LazyBlueprint('wizard', 'app.routes.wizard', url_prefix='/wizard')
+wizard_bp.lazy_route('/new', 'new_project', methods=['GET', 'POST'])
+wizard_bp.lazy_route('/new/<int:project_id>', 'new_project', methods=['GET', 'POST'])
+
+results_bp = LazyBlueprint('results', 'app.routes.results', url_prefix='/project')
+results_bp.lazy_route('/<int:project_id>/results', 'view_results')
+results_bp.lazy_route('/<int:project_id>/results/export', 'export_results')
+
+projects_bp = LazyBlueprint('projects', 'app.routes.projects', url_prefix='/projects')
+projects_bp.lazy_route('/list', 'list_projects')
+projects_bp.lazy_route('/projects/<int:project_id>', 'view_project')
+projects_bp.lazy_route('/projects/new', 'new_project', methods=['GET', 'POST'])
+projects_bp.lazy_route('/projects/<int:project_id>/edit', 'edit_project', methods=['GET', 'POST'])
+projects_bp.lazy_route('/projects/<int:project_id>/settings', 'project_settings', methods=['GET', 'POST'])
+projects_bp.lazy_route('/projects/<int:project_id>/delete', 'delete_project', methods=['POST'])
+projects_bp.lazy_route('/projects/<int:project_id>/export', 'export_project')
+projects_bp.lazy_route('/projects/import', 'import_project', methods=['GET', 'POST'])
+projects_bp.lazy_route('/api/projects/<int:project_id>/stats', 'project_stats')
+
+LAZY_BLUEPRINTS = (wizard_bp, results_bp, projects_bp)
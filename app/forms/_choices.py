@@ -0,0 +1,90 @@
+"""Choice tuples shared by the wizard forms"""
+
+# Tuplas imutáveis, compartilhadas por todas as instâncias dos formulários
+TECHNICAL_LEVEL_CHOICES = (
+    ('', 'Selecione um nível...'),
+    ('iniciante', 'Iniciante'),
+    ('intermediario', 'Intermediário'),
+    ('avancado', 'Avançado'),
+    ('academico', 'Acadêmico'),
+)
+
+DEPTH_LEVEL_CHOICES = (
+    (1, 'Básico (Visão Geral)'),
+    (2, 'Intermediário (Detalhado)'),
+    (3, 'Avançado (Técnico)'),
+    (4, 'Especializado (Acadêmico)'),
+    (5, 'Especializado (Pesquisa)'),
+)
+
+WRITING_TONE_CHOICES = (
+    ('', 'Selecione um tom...'),
+    ('formal', 'Formal'),
+    ('academico', 'Acadêmico'),
+    ('conversacional', 'Conversacional'),
+    ('persuasivo', 'Persuasivo'),
+    ('informativo', 'Informativo'),
+)
+
+LANGUAGE_CHOICES = (
+    ('pt-BR', 'Português (Brasil)'),
+    ('pt-PT', 'Português (Portugal)'),
+    ('en-US', 'English (US)'),
+)
+
+CONTENT_TYPE_CHOICES = (
+    ('', 'Selecione o tipo...'),
+    ('artigo', 'Artigo'),
+    ('tutorial', 'Tutorial'),
+    ('guia', 'Guia'),
+    ('relatorio', 'Relatório'),
+    ('apresentacao', 'Apresentação'),
+)
+
+STRUCTURE_PREFERENCE_CHOICES = (
+    ('', 'Selecione a estrutura...'),
+    ('linear', 'Linear (sequencial)'),
+    ('modular', 'Modular (seções independentes)'),
+    ('hierarquica', 'Hierárquica (tópicos e subtópicos)'),
+    ('comparativa', 'Comparativa (análise de alternativas)'),
+)
+
+WRITING_STYLE_CHOICES = (
+    ('', 'Selecione o estilo...'),
+    ('academico', 'Acadêmico'),
+    ('jornalistico', 'Jornalístico'),
+    ('conversacional', 'Conversacional'),
+    ('tecnico', 'Técnico'),
+    ('narrativo', 'Narrativo'),
+)
+
+TONE_CHOICES = (
+    ('', 'Selecione o tom...'),
+    ('formal', 'Formal'),
+    ('informal', 'Informal'),
+    ('neutro', 'Neutro'),
+    ('persuasivo', 'Persuasivo'),
+    ('educativo', 'Educativo'),
+)
+
+LANGUAGE_COMPLEXITY_CHOICES = (
+    ('', 'Selecione a complexidade...'),
+    ('simples', 'Simples'),
+    ('moderada', 'Moderada'),
+    ('complexa', 'Complexa'),
+    ('especializada', 'Especializada'),
+)
+
+ESTIMATED_LENGTH_CHOICES = (
+    ('curto', 'Curto (500-1000 palavras)'),
+    ('medio', 'Médio (1000-2500 palavras)'),
+    ('longo', 'Longo (2500-5000 palavras)'),
+    ('extenso', 'Extenso (5000+ palavras)'),
+)
+
+OUTPUT_FORMAT_CHOICES = (
+    ('markdown', 'Markdown'),
+    ('html', 'HTML'),
+    ('texto', 'Texto Simples'),
+    ('docx', 'Word Document'),
+)
@@ -0,0 +1,9 @@
+"""Messages shared between wizard validators and client-side render_kw hints"""
+import sys
+
+# Cada mensagem existe uma única vez: o mesmo objeto é usado pelo validador
+# do servidor e pelo atributo data-msg-* da validação no navegador
+MSG_BACKGROUND_INFO_MAXLEN = sys.intern('O contexto adicional não pode ter mais de 1000 caracteres')
+MSG_SELECT_WRITING_TONE = sys.intern('Por favor, selecione um tom de escrita')
+MSG_SELECT_LANGUAGE = sys.intern('Por favor, selecione um idioma')
+MSG_INVALID_NUMBER = sys.intern('Por favor, insira um número válido')
@@ -0,0 +1,19 @@
+"""Read-only render_kw mappings shared by the wizard forms"""
+from types import MappingProxyType
+
+
+def frozen_kw(*mappings, **extra):
+    """Merge render_kw fragments into a read-only mapping that is safe to share"""
+    merged = {}
+    for mapping in mappings:
+        merged.update(mapping)
+    merged.update(extra)
+    return MappingProxyType(merged)
+
+
+# Botões de navegação do assistente
+BTN_PRIMARY = frozen_kw({'class': 'btn btn-primary'})
+BTN_SECONDARY = frozen_kw({'class': 'btn btn-secondary'})
+
+# Base das áreas de texto com limite de 1000 caracteres
+TEXTAREA_1000 = frozen_kw(maxlength=1000, rows=3)
@@ -0,0 +1,74 @@
+"""Validator instances shared by the wizard forms"""
+from wtforms.validators import DataRequired, Length, Optional, NumberRange, InputRequired
+from app.forms._messages import MSG_BACKGROUND_INFO_MAXLEN, MSG_SELECT_WRITING_TONE, MSG_SELECT_LANGUAGE
+
+# Validadores não guardam estado: uma única instância (e uma única tupla)
+# pode ser usada por qualquer número de campos e formulários
+OPTIONAL = Optional()
+
+LEN_MAX_500 = Length(max=500)
+LEN_MAX_1000 = Length(max=1000)
+
+# Etapa 1: Contexto e Domínio
+REQUIRED_TITLE = DataRequired(message='O título do projeto é obrigatório')
+LEN_TITLE = Length(min=5, max=100, message='O título deve ter entre 5 e 100 caracteres')
+REQUIRED_DOMAIN = DataRequired(message='O domínio de conhecimento é obrigatório')
+LEN_DOMAIN = Length(min=3, max=100, message='O domínio deve ter entre 3 e 100 caracteres')
+REQUIRED_AUDIENCE = DataRequired(message='O público-alvo é obrigatório')
+LEN_AUDIENCE = Length(min=3, max=100, message='O público-alvo deve ter entre 3 e 100 caracteres')
+REQUIRED_TECHNICAL_LEVEL = InputRequired(message='Por favor, selecione um nível técnico')
+LEN_BACKGROUND_INFO = Length(max=1000, message=MSG_BACKGROUND_INFO_MAXLEN)
+
+VAL_TITLE = (REQUIRED_TITLE, LEN_TITLE)
+VAL_DOMAIN = (REQUIRED_DOMAIN, LEN_DOMAIN)
+VAL_AUDIENCE = (REQUIRED_AUDIENCE, LEN_AUDIENCE)
+VAL_TECHNICAL_LEVEL = (REQUIRED_TECHNICAL_LEVEL,)
+VAL_BACKGROUND_INFO = (OPTIONAL, LEN_BACKGROUND_INFO)
+
+# Etapa 2: Objetivos
+REQUIRED_PURPOSE = DataRequired(message='O propósito principal é obrigatório')
+LEN_PURPOSE = Length(min=10, max=500, message='O propósito principal deve ter entre 10 e 500 caracteres')
+LEN_LEARNING_OBJECTIVES = Length(max=1000, message='Os objetivos de aprendizado não podem ter mais de 1000 caracteres')
+LEN_CALL_TO_ACTION = Length(max=200, message='A chamada para ação não pode ter mais de 200 caracteres')
+
+VAL_PURPOSE = (REQUIRED_PURPOSE, LEN_PURPOSE)
+VAL_LEARNING_OBJECTIVES = (OPTIONAL, LEN_LEARNING_OBJECTIVES)
+VAL_CALL_TO_ACTION = (OPTIONAL, LEN_CALL_TO_ACTION)
+
+# Etapa 3: Escopo e Limitações
+LEN_SCOPE = Length(max=1000, message='O campo não pode ter mais de 1000 caracteres')
+RANGE_WORD_COUNT = NumberRange(min=100, max=10000, message='O número de palavras deve estar entre 100 e 10000')
+
+VAL_SCOPE = (OPTIONAL, LEN_SCOPE)
+VAL_WORD_COUNT = (OPTIONAL, RANGE_WORD_COUNT)
+
+# Etapa 4: Fontes e Referências
+LEN_SOURCES = Length(max=1000, message='As fontes não podem ter mais de 1000 caracteres')
+LEN_AUTHORS = Length(max=200, message='Os nomes dos autores não podem ter mais de 200 caracteres')
+LEN_TIME_PERIOD = Length(max=100, message='O período temporal não pode ter mais de 100 caracteres')
+RANGE_MIN_SOURCES = NumberRange(min=1, max=20, message='O número de fontes deve estar entre 1 e 20')
+
+VAL_SOURCES = (OPTIONAL, LEN_SOURCES)
+VAL_AUTHORS = (OPTIONAL, LEN_AUTHORS)
+VAL_TIME_PERIOD = (OPTIONAL, LEN_TIME_PERIOD)
+VAL_MIN_SOURCES = (OPTIONAL, RANGE_MIN_SOURCES)
+
+# Etapa 5: Estilo e Formatação
+REQUIRED_WRITING_TONE = InputRequired(message=MSG_SELECT_WRITING_TONE)
+REQUIRED_LANGUAGE = InputRequired(message=MSG_SELECT_LANGUAGE)
+LEN_SECTIONS = Length(max=500, message='As seções não podem ter mais de 500 caracteres')
+LEN_GUIDELINES = Length(max=1000, message='As diretrizes não podem ter mais de 1000 caracteres')
+
+VAL_WRITING_TONE = (REQUIRED_WRITING_TONE,)
+VAL_LANGUAGE = (REQUIRED_LANGUAGE,)
+VAL_SECTIONS = (OPTIONAL, LEN_SECTIONS)
+VAL_GUIDELINES = (OPTIONAL, LEN_GUIDELINES)
+
+# Formulário combinado
+VAL_OPTIONAL_MAX_500 = (OPTIONAL, LEN_MAX_500)
+VAL_OPTIONAL_MAX_1000 = (OPTIONAL, LEN_MAX_1000)
+VAL_CONTENT_TYPE = (InputRequired(message='Por favor, selecione o tipo de conteúdo'),)
+VAL_STRUCTURE = (InputRequired(message='Por favor, selecione a estrutura'),)
+VAL_WRITING_STYLE = (InputRequired(message='Por favor, selecione o estilo'),)
+VAL_TONE = (InputRequired(message='Por favor, selecione o tom'),)
+VAL_COMPLEXITY = (InputRequired(message='Por favor, selecione a complexidade'),)
@@ -1,52 +1,95 @@
+import hmac
+
+from flask import g
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
-from app.models.user import User
+from sqlalchemy import exists, select
+from app import db, cache
+
+class ConstantTimeEqualTo(EqualTo):
+    """EqualTo that compares the two values in constant time"""
+    def __call__(self, form, field):
+        try:
+            other = form[self.fieldname]
+        except KeyError as exc:
+            raise ValidationError(field.gettext("Invalid field name '%s'.") % self.fieldname) from exc
+        if hmac.compare_digest((field.data or '').encode(), (other.data or '').encode()):
+            return
+        
+        d = {
+            'other_label': hasattr(other, 'label') and other.label.text or self.fieldname,
+            'other_name': self.fieldname,
+        }
+        message = self.message
+        if message is None:
+            message = field.gettext('Field must be equal to %(other_name)s.')
+        raise ValidationError(message % d)
+
+# Validators are stateless, so one instance is shared by every form and field
+_REQ = DataRequired()
+_EMAIL = Email()
+_MIN6 = Length(min=6)
+_USERNAME_LEN = Length(min=4, max=20)
+_EQ_PW = ConstantTimeEqualTo('password')
+
+# Only positive answers are cached: a taken name stays taken, while a cached
+# "free" answer could go stale in another worker right after a registration
+@cache.memoize(60, response_filter=bool)
+def username_taken(username):
+    from app.models.user import User
+    return db.session.execute(select(exists().where(User.username == username))).scalar()
+
+@cache.memoize(60, response_filter=bool)
+def email_taken(email):
+    from app.models.user import User
+    return db.session.execute(select(exists().where(User.email == email))).scalar()
+
+_TAKEN_CHECKS = {'username': username_taken, 'email': email_taken}
+
+def _user_exists_by(field, value):
+    """Check whether a user with the given column value exists, memoized per request"""
+    request_cache = g.setdefault('_user_exists', {})
+    key = (field, value)
+    if key not in request_cache:
+        request_cache[key] = _TAKEN_CHECKS[field](value)
+    return request_cache[key]
 
 class RegistrationForm(FlaskForm):
     username = StringField('Nome de Usuário', 
-                         validators=[DataRequired(), 
-                                    Length(min=4, max=20)])
+                         validators=[_REQ, _USERNAME_LEN])
     email = StringField('Email',
-                       validators=[DataRequired(), 
-                                 Email()])
+                       validators=[_REQ, _EMAIL])
     password = PasswordField('Senha',
-                           validators=[DataRequired(),
-                                     Length(min=6)])
+                           validators=[_REQ, _MIN6])
     confirm_password = PasswordField('Confirmar Senha',
-                                   validators=[DataRequired(),
-                                              EqualTo('password')])
+                                   validators=[_REQ, _EQ_PW])
     submit = SubmitField('Cadastrar')
 
     def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
+        if _user_exists_by('username', username.data):
             raise ValidationError('Este nome de usuário já está em uso. Por favor, escolha outro.')
 
     def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
+        if _user_exists_by('email', email.data):
             raise ValidationError('Este email já está cadastrado. Por favor, use outro email.')
 
 class LoginForm(FlaskForm):
     email = StringField('Email',
-                       validators=[DataRequired(), 
-                                 Email()])
+                       validators=[_REQ, _EMAIL])
     password = PasswordField('Senha',
-                           validators=[DataRequired()])
+                           validators=[_REQ])
     remember_me = BooleanField('Lembrar de mim')
     submit = SubmitField('Entrar')
 
 class ResetPasswordRequestForm(FlaskForm):
     email = StringField('Email',
-                       validators=[DataRequired(), 
-                                 Email()])
+                       validators=[_REQ, _EMAIL])
     submit = SubmitField('Solicitar Redefinição de Senha')
 
 class ResetPasswordForm(FlaskForm):
     password = PasswordField('Nova Senha',
-                           validators=[DataRequired()])
+                           validators=[_REQ])
     confirm_password = PasswordField('Repita a Senha',
-                                   validators=[DataRequired(),
-                                              EqualTo('password')])
+                                   validators=[_REQ, _EQ_PW])
     submit = SubmitField('Redefinir Senha')
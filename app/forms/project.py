@@ -1,38 +1,59 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, SelectField, BooleanField, SubmitField, FileField
+from wtforms import StringField, TextAreaField, SelectField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Length, Optional
 from flask_wtf.file import FileField, FileAllowed, FileRequired
 
+# Opções dos campos de seleção, compartilhadas por todas as instâncias dos formulários
+_STATUS_CHOICES = (
+    ('draft', 'Rascunho'),
+    ('active', 'Ativo'),
+    ('paused', 'Pausado'),
+    ('archived', 'Arquivado')
+)
+
+_LANGUAGE_CHOICES = (
+    ('pt-BR', 'Português (Brasil)'),
+    ('en-US', 'English (US)'),
+    ('es-ES', 'Español')
+)
+
+_VISIBILITY_CHOICES = (
+    ('private', 'Privado (apenas você)'),
+    ('team', 'Time (membros da equipe)'),
+    ('public', 'Público (qualquer pessoa com o link)')
+)
+
+_DEFAULT_EXPORT_FORMAT_CHOICES = (
+    ('markdown', 'Markdown (.md)'),
+    ('html', 'HTML (.html)'),
+    ('pdf', 'PDF (.pdf)'),
+    ('docx', 'Word (.docx)')
+)
+
+_EXPORT_FORMAT_CHOICES = (
+    ('zip', 'ZIP (completo)'),
+    ('json', 'JSON (apenas dados)'),
+    ('markdown', 'Markdown (apenas conteúdo)')
+)
+
+# Validadores sem estado, compartilhados por todas as instâncias dos formulários
+_TITLE_REQUIRED = DataRequired(message='O título é obrigatório')
+_TITLE_LENGTH = Length(max=200, message='O título não pode ter mais de 200 caracteres')
+_DESCRIPTION_LENGTH = Length(max=1000, message='A descrição não pode ter mais de 1000 caracteres')
+_OPTIONAL = Optional()
+_REQUIRED = DataRequired()
+
 class ProjectForm(FlaskForm):
     """Formulário para criar/editar um projeto"""
-    title = StringField('Título', validators=[
-        DataRequired(message='O título é obrigatório'),
-        Length(max=200, message='O título não pode ter mais de 200 caracteres')
-    ])
+    title = StringField('Título', validators=[_TITLE_REQUIRED, _TITLE_LENGTH])
     
-    description = TextAreaField('Descrição', validators=[
-        Optional(),
-        Length(max=1000, message='A descrição não pode ter mais de 1000 caracteres')
-    ])
+    description = TextAreaField('Descrição', validators=[_OPTIONAL, _DESCRIPTION_LENGTH])
     
-    status = SelectField('Status', choices=[
-        ('draft', 'Rascunho'),
-        ('active', 'Ativo'),
-        ('paused', 'Pausado'),
-        ('archived', 'Arquivado')
-    ], validators=[DataRequired()])
+    status = SelectField('Status', choices=_STATUS_CHOICES, validators=[_REQUIRED])
     
-    language = SelectField('Idioma', choices=[
-        ('pt-BR', 'Português (Brasil)'),
-        ('en-US', 'English (US)'),
-        ('es-ES', 'Español')
-    ], default='pt-BR')
+    language = SelectField('Idioma', choices=_LANGUAGE_CHOICES, default='pt-BR')
     
-    visibility = SelectField('Visibilidade', choices=[
-        ('private', 'Privado (apenas você)'),
-        ('team', 'Time (membros da equipe)'),
-        ('public', 'Público (qualquer pessoa com o link)')
-    ], default='private')
+    visibility = SelectField('Visibilidade', choices=_VISIBILITY_CHOICES, default='private')
     
     submit = SubmitField('Salvar e Iniciar')
 
@@ -47,12 +68,7 @@ class ProjectSettingsForm(FlaskForm):
                                description='Receber notificações sobre este projeto')
     
     export_format = SelectField('Formato de exportação padrão',
-                              choices=[
-                                  ('markdown', 'Markdown (.md)'),
-                                  ('html', 'HTML (.html)'),
-                                  ('pdf', 'PDF (.pdf)'),
-                                  ('docx', 'Word (.docx)')
-                              ],
+                              choices=_DEFAULT_EXPORT_FORMAT_CHOICES,
                               default='markdown')
     
     api_access = BooleanField('Acesso via API',
@@ -81,11 +97,7 @@ class ExportProjectForm(FlaskForm):
                                     description='Incluir todo o histórico de execuções')
     
     format = SelectField('Formato de exportação',
-                        choices=[
-                            ('zip', 'ZIP (completo)'),
-                            ('json', 'JSON (apenas dados)'),
-                            ('markdown', 'Markdown (apenas conteúdo)')
-                        ],
+                        choices=_EXPORT_FORMAT_CHOICES,
                         default='zip')
     
     submit = SubmitField('Exportar Projeto')
@@ -1,28 +1,52 @@
+import sys
+
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, SelectField, BooleanField, SubmitField, IntegerField, validators
-from wtforms.validators import DataRequired, Length, Optional, NumberRange, InputRequired
-from flask_wtf.file import FileField, FileAllowed
+from app.forms._choices import (
+    TECHNICAL_LEVEL_CHOICES, DEPTH_LEVEL_CHOICES, WRITING_TONE_CHOICES, LANGUAGE_CHOICES,
+    CONTENT_TYPE_CHOICES, STRUCTURE_PREFERENCE_CHOICES, WRITING_STYLE_CHOICES, TONE_CHOICES,
+    LANGUAGE_COMPLEXITY_CHOICES, ESTIMATED_LENGTH_CHOICES, OUTPUT_FORMAT_CHOICES,
+)
+from app.forms._messages import (
+    MSG_BACKGROUND_INFO_MAXLEN, MSG_SELECT_WRITING_TONE, MSG_SELECT_LANGUAGE, MSG_INVALID_NUMBER,
+)
+from app.forms._render_kw import frozen_kw, BTN_PRIMARY, BTN_SECONDARY, TEXTAREA_1000
+from app.forms._validators import (
+    VAL_TITLE, VAL_DOMAIN, VAL_AUDIENCE, VAL_TECHNICAL_LEVEL, VAL_BACKGROUND_INFO,
+    VAL_PURPOSE, VAL_LEARNING_OBJECTIVES, VAL_CALL_TO_ACTION,
+    VAL_SCOPE, VAL_WORD_COUNT,
+    VAL_SOURCES, VAL_AUTHORS, VAL_TIME_PERIOD, VAL_MIN_SOURCES,
+    VAL_WRITING_TONE, VAL_LANGUAGE, VAL_SECTIONS, VAL_GUIDELINES,
+    VAL_OPTIONAL_MAX_500, VAL_OPTIONAL_MAX_1000,
+    VAL_CONTENT_TYPE, VAL_STRUCTURE, VAL_WRITING_STYLE, VAL_TONE, VAL_COMPLEXITY,
+)
 
 class RequiredIf(validators.DataRequired):
-    """Validator which makes a field required if another field is set and has a truthy value."""
+    """Validator which makes a field required if another field is set (not None, '' or False)."""
     def __init__(self, other_field_name, *args, **kwargs):
-        self.other_field_name = other_field_name
+        self.other_field_name = sys.intern(other_field_name)
+        self._missing_field_message = f'No field named "{other_field_name}" in form'
         super().__init__(*args, **kwargs)
 
     def __call__(self, form, field):
-        other_field = form._fields.get(self.other_field_name)
-        if other_field is None:
-            raise Exception(f'No field named "{self.other_field_name}" in form')
-        if bool(other_field.data):
-            super().__call__(form, field)
+        try:
+            other_field = form._fields[self.other_field_name]
+        except KeyError:
+            raise LookupError(self._missing_field_message) from None
+        data = other_field.data
+        if data is None or data == '' or data is False:
+            return
+        super().__call__(form, field)
+
+class WizardNavMixin:
+    """Next/back buttons shared by the wizard steps"""
+    next = SubmitField('Próximo', render_kw=BTN_PRIMARY)
+    back = SubmitField('Voltar', render_kw=BTN_SECONDARY)
 
-class WizardStep1Form(FlaskForm):
+class WizardStep1Form(WizardNavMixin, FlaskForm):
     """Step 1: Context and Domain"""
     project_title = StringField('Título do Projeto', 
-                              validators=[
-                                  DataRequired(message='O título do projeto é obrigatório'),
-                                  Length(min=5, max=100, message='O título deve ter entre 5 e 100 caracteres')
-                              ],
+                              validators=VAL_TITLE,
                               render_kw={
                                   'minlength': 5,
                                   'maxlength': 100,
@@ -32,10 +56,7 @@ class WizardStep1Form(FlaskForm):
                               })
                               
     knowledge_domain = StringField('Domínio de Conhecimento',
-                                 validators=[
-                                     DataRequired(message='O domínio de conhecimento é obrigatório'),
-                                     Length(min=3, max=100, message='O domínio deve ter entre 3 e 100 caracteres')
-                                 ],
+                                 validators=VAL_DOMAIN,
                                  render_kw={
                                      'minlength': 3,
                                      'maxlength': 100,
@@ -44,10 +65,7 @@ class WizardStep1Form(FlaskForm):
                                  })
                                   
     target_audience = StringField('Público-Alvo',
-                                validators=[
-                                    DataRequired(message='O público-alvo é obrigatório'),
-                                    Length(min=3, max=100, message='O público-alvo deve ter entre 3 e 100 caracteres')
-                                ],
+                                validators=VAL_AUDIENCE,
                                 render_kw={
                                     'minlength': 3,
                                     'maxlength': 100,
@@ -56,45 +74,20 @@ class WizardStep1Form(FlaskForm):
                                 })
                                 
     technical_level = SelectField('Nível Técnico',
-                                choices=[
-                                    ('', 'Selecione um nível...'),
-                                    ('iniciante', 'Iniciante'),
-                                    ('intermediario', 'Intermediário'),
-                                    ('avancado', 'Avançado'),
-                                    ('academico', 'Acadêmico')
-                                ],
-                                validators=[
-                                    InputRequired(message='Por favor, selecione um nível técnico')
-                                ])
+                                choices=TECHNICAL_LEVEL_CHOICES,
+                                validators=VAL_TECHNICAL_LEVEL)
                                 
     background_info = TextAreaField('Contexto Adicional',
-                                  validators=[
-                                      Optional(),
-                                      Length(max=1000, message='O contexto adicional não pode ter mais de 1000 caracteres')
-                                  ],
-                                  render_kw={
-                                      'maxlength': 1000,
-                                      'data-msg-maxlength': 'O contexto adicional não pode ter mais de 1000 caracteres',
-                                      'rows': 3
-                                  })
+                                  validators=VAL_BACKGROUND_INFO,
+                                  render_kw=frozen_kw(TEXTAREA_1000, {'data-msg-maxlength': MSG_BACKGROUND_INFO_MAXLEN}))
                                   
-    next = SubmitField('Próximo', render_kw={'class': 'btn btn-primary'})
-    
-    def validate(self, **kwargs):
-        # Standard validation
-        if not super().validate():
-            return False
-            
-        # Additional custom validation can be added here
-        return True
+    # First step: nothing to go back to
+    back = None
 
-class WizardStep2Form(FlaskForm):
+class WizardStep2Form(WizardNavMixin, FlaskForm):
     """Step 2: Objectives"""
     main_purpose = TextAreaField('Propósito Principal',
-                               validators=[
-                                   DataRequired(message='O propósito principal é obrigatório'),
-                                   Length(min=10, max=500, message='O propósito principal deve ter entre 10 e 500 caracteres')
-                               ],
+                               validators=VAL_PURPOSE,
                                render_kw={
                                    'minlength': 10,
                                    'maxlength': 500,
@@ -104,117 +97,57 @@ class WizardStep2Form(FlaskForm):
                                })
                                
     learning_objectives = TextAreaField('Objetivos de Aprendizado',
-                                      validators=[
-                                          Optional(),
-                                          Length(max=1000, message='Os objetivos de aprendizado não podem ter mais de 1000 caracteres')
-                                      ],
-                                      render_kw={
-                                          'maxlength': 1000,
-                                          'rows': 3,
-                                          'placeholder': 'O que os leitores devem aprender com este conteúdo?'
-                                      })
+                                      validators=VAL_LEARNING_OBJECTIVES,
+                                      render_kw=frozen_kw(TEXTAREA_1000, placeholder='O que os leitores devem aprender com este conteúdo?'))
                                       
     call_to_action = StringField('Chamada para Ação',
-                               validators=[
-                                   Optional(),
-                                   Length(max=200, message='A chamada para ação não pode ter mais de 200 caracteres')
-                               ],
+                               validators=VAL_CALL_TO_ACTION,
                                render_kw={
                                    'maxlength': 200,
                                    'placeholder': 'O que você quer que o leitor faça após a leitura?'
                                })
-                               
-    next = SubmitField('Próximo', render_kw={'class': 'btn btn-primary'})
-    back = SubmitField('Voltar', render_kw={'class': 'btn btn-secondary'})
-    
-    def validate(self, **kwargs):
-        if not super().validate():
-            return False
-        return True
 
-class WizardStep3Form(FlaskForm):
+class WizardStep3Form(WizardNavMixin, FlaskForm):
     """Step 3: Scope and Limitations"""
     must_include = TextAreaField('Deve Incluir',
-                               validators=[
-                                   Optional(),
-                                   Length(max=1000, message='O campo não pode ter mais de 1000 caracteres')
-                               ],
-                               render_kw={
-                                   'maxlength': 1000,
-                                   'rows': 3,
-                                   'placeholder': 'Quais tópicos ou informações devem ser incluídos?'
-                               })
+                               validators=VAL_SCOPE,
+                               render_kw=frozen_kw(TEXTAREA_1000, placeholder='Quais tópicos ou informações devem ser incluídos?'))
                                
     must_exclude = TextAreaField('Deve Excluir',
-                               validators=[
-                                   Optional(),
-                                   Length(max=1000, message='O campo não pode ter mais de 1000 caracteres')
-                               ],
-                               render_kw={
-                                   'maxlength': 1000,
-                                   'rows': 3,
-                                   'placeholder': 'Há algum tópico que deve ser evitado?'
-                               })
+                               validators=VAL_SCOPE,
+                               render_kw=frozen_kw(TEXTAREA_1000, placeholder='Há algum tópico que deve ser evitado?'))
                                
     word_count = IntegerField('Número de Palavras Alvo',
-                            validators=[
-                                Optional(),
-                                NumberRange(min=100, max=10000, message='O número de palavras deve estar entre 100 e 10000')
-                            ],
+                            validators=VAL_WORD_COUNT,
                             render_kw={
                                 'min': 100,
                                 'max': 10000,
                                 'placeholder': 'Opcional, padrão: 1000',
-                                'data-msg-number': 'Por favor, insira um número válido',
+                                'data-msg-number': MSG_INVALID_NUMBER,
                                 'data-msg-min': 'Mínimo de 100 palavras',
                                 'data-msg-max': 'Máximo de 10000 palavras'
                             })
                             
     depth_level = SelectField('Nível de Profundidade', 
-                            choices=[
-                                ('1', 'Básico (Visão Geral)'),
-                                ('2', 'Intermediário (Detalhado)'),
-                                ('3', 'Avançado (Técnico)'),
-                                ('4', 'Especializado (Acadêmico)'),
-                                ('5', 'Especializado (Pesquisa)')
-                            ],
-                            default='2')
-    next = SubmitField('Próximo', render_kw={'class': 'btn btn-primary'})
-    back = SubmitField('Voltar', render_kw={'class': 'btn btn-secondary'})
-    
-    def validate(self, **kwargs):
-        if not super().validate():
-            return False
-        return True
+                            choices=DEPTH_LEVEL_CHOICES,
+                            coerce=int,
+                            default=2)
 
-class WizardStep4Form(FlaskForm):
+class WizardStep4Form(WizardNavMixin, FlaskForm):
     """Step 4: Sources and References"""
     preferred_sources = TextAreaField('Fontes Preferenciais',
-                                   validators=[
-                                       Optional(),
-                                       Length(max=1000, message='As fontes não podem ter mais de 1000 caracteres')
-                                   ],
-                                   render_kw={
-                                       'maxlength': 1000,
-                                       'rows': 3,
-                                       'placeholder': 'Links ou nomes de fontes confiáveis que devem ser usadas'
-                                   })
+                                   validators=VAL_SOURCES,
+                                   render_kw=frozen_kw(TEXTAREA_1000, placeholder='Links ou nomes de fontes confiáveis que devem ser usadas'))
                                    
     key_authors = StringField('Autores de Referência',
-                             validators=[
-                                 Optional(),
-                                 Length(max=200, message='Os nomes dos autores não podem ter mais de 200 caracteres')
-                             ],
+                             validators=VAL_AUTHORS,
                              render_kw={
                                  'maxlength': 200,
                                  'placeholder': 'Autores importantes no assunto'
                              })
                              
     time_period = StringField('Período Temporal',
-                             validators=[
-                                 Optional(),
-                                 Length(max=100, message='O período temporal não pode ter mais de 100 caracteres')
-                             ],
+                             validators=VAL_TIME_PERIOD,
                              render_kw={
                                  'maxlength': 100,
                                  'placeholder': 'Ex: Século XX, 2000-2010, etc.'
@@ -231,64 +164,35 @@ class WizardStep4Form(FlaskForm):
                                     })
                                     
     min_sources = IntegerField('Número Mínimo de Fontes',
-                             validators=[
-                                 Optional(),
-                                 NumberRange(min=1, max=20, message='O número de fontes deve estar entre 1 e 20')
-                             ],
+                             validators=VAL_MIN_SOURCES,
                              default=3,
                              render_kw={
                                  'min': 1,
                                  'max': 20,
-                                 'data-msg-number': 'Por favor, insira um número válido',
+                                 'data-msg-number': MSG_INVALID_NUMBER,
                                  'data-msg-min': 'Mínimo de 1 fonte',
                                  'data-msg-max': 'Máximo de 20 fontes'
                              })
-                             
-    next = SubmitField('Próximo', render_kw={'class': 'btn btn-primary'})
-    back = SubmitField('Voltar', render_kw={'class': 'btn btn-secondary'})
-    
-    def validate(self, **kwargs):
-        if not super().validate():
-            return False
-        return True
 
-class WizardStep5Form(FlaskForm):
+class WizardStep5Form(WizardNavMixin, FlaskForm):
     """Step 5: Style and Formatting"""
     writing_tone = SelectField('Tom de Escrita',
-                             choices=[
-                                 ('', 'Selecione um tom...'),
-                                 ('formal', 'Formal'),
-                                 ('academico', 'Acadêmico'),
-                                 ('conversacional', 'Conversacional'),
-                                 ('persuasivo', 'Persuasivo'),
-                                 ('informativo', 'Informativo')
-                             ],
+                             choices=WRITING_TONE_CHOICES,
                              default='academico',
-                             validators=[
-                                 InputRequired(message='Por favor, selecione um tom de escrita')
-                             ],
+                             validators=VAL_WRITING_TONE,
                              render_kw={
-                                 'data-msg-required': 'Por favor, selecione um tom de escrita'
+                                 'data-msg-required': MSG_SELECT_WRITING_TONE
                              })
                              
     language = SelectField('Idioma',
-                         choices=[
-                             ('pt-BR', 'Português (Brasil)'),
-                             ('pt-PT', 'Português (Portugal)'),
-                             ('en-US', 'English (US)')
-                         ],
-                         validators=[
-                             InputRequired(message='Por favor, selecione um idioma')
-                         ],
+                         choices=LANGUAGE_CHOICES,
+                         validators=VAL_LANGUAGE,
                          render_kw={
-                             'data-msg-required': 'Por favor, selecione um idioma'
+                             'data-msg-required': MSG_SELECT_LANGUAGE
                          })
                          
     required_sections = TextAreaField('Seções Obrigatórias',
-                                    validators=[
-                                        Optional(),
-                                        Length(max=500, message='As seções não podem ter mais de 500 caracteres')
-                                    ],
+                                    validators=VAL_SECTIONS,
                                     render_kw={
                                         'maxlength': 500,
                                         'rows': 3,
@@ -296,23 +200,10 @@ class WizardStep5Form(FlaskForm):
                                     })
                                     
     formatting_guidelines = TextAreaField('Diretrizes de Formatação',
-                                        validators=[
-                                            Optional(),
-                                            Length(max=1000, message='As diretrizes não podem ter mais de 1000 caracteres')
-                                        ],
-                                        render_kw={
-                                            'maxlength': 1000,
-                                            'rows': 3,
-                                            'placeholder': 'Alguma orientação específica de formatação?'
-                                        })
+                                        validators=VAL_GUIDELINES,
+                                        render_kw=frozen_kw(TEXTAREA_1000, placeholder='Alguma orientação específica de formatação?'))
                                         
-    next = SubmitField('Revisar', render_kw={'class': 'btn btn-primary'})
-    back = SubmitField('Voltar', render_kw={'class': 'btn btn-secondary'})
-    
-    def validate(self, **kwargs):
-        if not super().validate():
-            return False
-        return True
+    next = SubmitField('Revisar', render_kw=BTN_PRIMARY)
 
 class WizardReviewForm(FlaskForm):
     """Final Review Step"""
@@ -320,137 +211,65 @@ class WizardReviewForm(FlaskForm):
     back = SubmitField('Voltar')
     save_draft = SubmitField('Salvar Rascunho')
 
-class CombinedWizardForm(FlaskForm):
-    """Combined form with all wizard steps"""
-    # Step 1 fields
-    project_title = StringField('Título do Projeto', 
-                              validators=[
-                                  DataRequired(message='O título do projeto é obrigatório'),
-                                  Length(min=5, max=100, message='O título deve ter entre 5 e 100 caracteres')
-                              ])
-                              
-    knowledge_domain = StringField('Domínio de Conhecimento',
-                                 validators=[
-                                     DataRequired(message='O domínio de conhecimento é obrigatório'),
-                                     Length(min=3, max=100, message='O domínio deve ter entre 3 e 100 caracteres')
-                                 ])
-                                  
-    target_audience = StringField('Público-Alvo',
-                                validators=[
-                                    DataRequired(message='O público-alvo é obrigatório'),
-                                    Length(min=3, max=100, message='O público-alvo deve ter entre 3 e 100 caracteres')
-                                ])
-                                
-    technical_level = SelectField('Nível Técnico',
-                                choices=[
-                                    ('', 'Selecione um nível...'),
-                                    ('iniciante', 'Iniciante'),
-                                    ('intermediario', 'Intermediário'),
-                                    ('avancado', 'Avançado'),
-                                    ('academico', 'Acadêmico')
-                                ],
-                                validators=[
-                                    InputRequired(message='Por favor, selecione um nível técnico')
-                                ])
-                                
-    background_info = TextAreaField('Contexto Adicional',
-                                  validators=[Optional(), Length(max=1000)])
-
+# (name, field class, label, field options) for the combined form fields that
+# are not inherited from WizardStep1Form/WizardStep2Form, in display order
+_COMBINED_SPEC = (
     # Step 2 fields
-    main_purpose = TextAreaField('Propósito Principal',
-                               validators=[
-                                   DataRequired(message='O propósito principal é obrigatório'),
-                                   Length(min=10, max=500, message='O propósito principal deve ter entre 10 e 500 caracteres')
-                               ])
-                               
-    learning_objectives = TextAreaField('Objetivos de Aprendizado',
-                                      validators=[Optional(), Length(max=1000)])
-                                      
-    success_criteria = TextAreaField('Critérios de Sucesso',
-                                   validators=[Optional(), Length(max=500)])
-
-    # Step 3 fields
-    content_type = SelectField('Tipo de Conteúdo',
-                             choices=[
-                                 ('', 'Selecione o tipo...'),
-                                 ('artigo', 'Artigo'),
-                                 ('tutorial', 'Tutorial'),
-                                 ('guia', 'Guia'),
-                                 ('relatorio', 'Relatório'),
-                                 ('apresentacao', 'Apresentação')
-                             ],
-                             validators=[InputRequired(message='Por favor, selecione o tipo de conteúdo')])
+    ('success_criteria', TextAreaField, 'Critérios de Sucesso', {'validators': VAL_OPTIONAL_MAX_500}),
     
-    structure_preference = SelectField('Estrutura Preferida',
-                                     choices=[
-                                         ('', 'Selecione a estrutura...'),
-                                         ('linear', 'Linear (sequencial)'),
-                                         ('modular', 'Modular (seções independentes)'),
-                                         ('hierarquica', 'Hierárquica (tópicos e subtópicos)'),
-                                         ('comparativa', 'Comparativa (análise de alternativas)')
-                                     ],
-                                     validators=[InputRequired(message='Por favor, selecione a estrutura')])
+    # Step 3 fields
+    ('content_type', SelectField, 'Tipo de Conteúdo',
+     {'choices': CONTENT_TYPE_CHOICES, 'validators': VAL_CONTENT_TYPE}),
+    ('structure_preference', SelectField, 'Estrutura Preferida',
+     {'choices': STRUCTURE_PREFERENCE_CHOICES, 'validators': VAL_STRUCTURE}),
+    ('sections_topics', TextAreaField, 'Seções e Tópicos', {'validators': VAL_OPTIONAL_MAX_1000}),
     
-    sections_topics = TextAreaField('Seções e Tópicos',
-                                  validators=[Optional(), Length(max=1000)])
-
     # Step 4 fields
-    writing_style = SelectField('Estilo de Escrita',
-                              choices=[
-                                  ('', 'Selecione o estilo...'),
-                                  ('academico', 'Acadêmico'),
-                                  ('jornalistico', 'Jornalístico'),
-                                  ('conversacional', 'Conversacional'),
-                                  ('tecnico', 'Técnico'),
-                                  ('narrativo', 'Narrativo')
-                              ],
-                              validators=[InputRequired(message='Por favor, selecione o estilo')])
+    ('writing_style', SelectField, 'Estilo de Escrita',
+     {'choices': WRITING_STYLE_CHOICES, 'validators': VAL_WRITING_STYLE}),
+    ('tone', SelectField, 'Tom', {'choices': TONE_CHOICES, 'validators': VAL_TONE}),
+    ('language_complexity', SelectField, 'Complexidade da Linguagem',
+     {'choices': LANGUAGE_COMPLEXITY_CHOICES, 'validators': VAL_COMPLEXITY}),
+    ('style_references', TextAreaField, 'Referências de Estilo', {'validators': VAL_OPTIONAL_MAX_500}),
     
-    tone = SelectField('Tom',
-                     choices=[
-                         ('', 'Selecione o tom...'),
-                         ('formal', 'Formal'),
-                         ('informal', 'Informal'),
-                         ('neutro', 'Neutro'),
-                         ('persuasivo', 'Persuasivo'),
-                         ('educativo', 'Educativo')
-                     ],
-                     validators=[InputRequired(message='Por favor, selecione o tom')])
-    
-    language_complexity = SelectField('Complexidade da Linguagem',
-                                    choices=[
-                                        ('', 'Selecione a complexidade...'),
-                                        ('simples', 'Simples'),
-                                        ('moderada', 'Moderada'),
-                                        ('complexa', 'Complexa'),
-                                        ('especializada', 'Especializada')
-                                    ],
-                                    validators=[InputRequired(message='Por favor, selecione a complexidade')])
-    
-    style_references = TextAreaField('Referências de Estilo',
-                                   validators=[Optional(), Length(max=500)])
-
     # Step 5 fields
-    estimated_length = SelectField('Tamanho Estimado',
-                                 choices=[
-                                     ('curto', 'Curto (500-1000 palavras)'),
-                                     ('medio', 'Médio (1000-2500 palavras)'),
-                                     ('longo', 'Longo (2500-5000 palavras)'),
-                                     ('extenso', 'Extenso (5000+ palavras)')
-                                 ],
-                                 default='medio')
-    
-    output_format = SelectField('Formato de Saída',
-                              choices=[
-                                  ('markdown', 'Markdown'),
-                                  ('html', 'HTML'),
-                                  ('texto', 'Texto Simples'),
-                                  ('docx', 'Word Document')
-                              ],
-                              default='markdown')
-    
-    special_requirements = TextAreaField('Requisitos Especiais',
-                                       validators=[Optional(), Length(max=1000)])
-    
-    additional_notes = TextAreaField('Observações Adicionais',
-                                   validators=[Optional(), Length(max=500)])
+    ('estimated_length', SelectField, 'Tamanho Estimado',
+     {'choices': ESTIMATED_LENGTH_CHOICES, 'default': 'medio'}),
+    ('output_format', SelectField, 'Formato de Saída',
+     {'choices': OUTPUT_FORMAT_CHOICES, 'default': 'markdown'}),
+    ('special_requirements', TextAreaField, 'Requisitos Especiais', {'validators': VAL_OPTIONAL_MAX_1000}),
+    ('additional_notes', TextAreaField, 'Observações Adicionais', {'validators': VAL_OPTIONAL_MAX_500}),
+)
+
+# Built through FlaskForm's metaclass so WTForms collects the fields as usual.
+# Steps 1 and 2 are inherited as-is (sharing their UnboundFields); the single
+# page collects different data for steps 3-5, so those forms are not bases.
+CombinedWizardForm = type(FlaskForm)('CombinedWizardForm', (WizardStep1Form, WizardStep2Form), {
+    '__doc__': 'Combined form with all wizard steps',
+    '__module__': __name__,
+    'next': None,
+    'back': None,
+    'call_to_action': None,
+    **{name: field_cls(label, **options) for name, field_cls, label, options in _COMBINED_SPEC},
+})
+
+def _prime_unbound_fields(*form_classes):
+    """Collect and sort each form's UnboundFields at import time
+
+    Mirrors what WTForms' FormMeta does on the first instantiation of a form
+    class, so a cold worker does not pay for it on its first request.
+    """
+    for form_class in form_classes:
+        fields = []
+        for name in dir(form_class):
+            if not name.startswith('_'):
+                unbound_field = getattr(form_class, name)
+                if hasattr(unbound_field, '_formfield'):
+                    fields.append((name, unbound_field))
+        fields.sort(key=lambda x: (x[1].creation_counter, x[0]))
+        form_class._unbound_fields = fields
+
+_prime_unbound_fields(
+    WizardStep1Form, WizardStep2Form, WizardStep3Form, WizardStep4Form,
+    WizardStep5Form, WizardReviewForm, CombinedWizardForm,
+)
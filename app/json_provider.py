@@ -0,0 +1,39 @@
+import json
+
+import orjson
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson
+
+    Datetimes are serialized natively as ISO 8601; naive values are the UTC
+    timestamps stored by the models, so they get an explicit +00:00 offset.
+    """
+    # Chaves int (ids) são aceitas como no módulo json padrão
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    # Types orjson does not know (Decimal, objects with __html__, ...) are
+    # handled like Flask's default provider does
+    default = staticmethod(DefaultJSONProvider.default)
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop('sort_keys', False)
+        if kwargs:
+            # indent, separators, default... only the standard json module knows
+            kwargs.setdefault('default', self.default)
+            return json.dumps(obj, sort_keys=sort_keys, **kwargs)
+        option = self.option | orjson.OPT_SORT_KEYS if sort_keys else self.option
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        # The session serializer passes object_hook to restore tagged values
+        # (tuples, bytes, Markup...), which orjson does not support
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def json_column_serializer(value):
+    """Serializer for SQLAlchemy JSON columns (orjson, returned as str)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
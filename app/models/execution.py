@@ -1,7 +1,12 @@
+import json
 from datetime import datetime
 from enum import Enum
 from app import db
-from sqlalchemy import JSON as JSONType
+from app.utils import log_buffer
+from sqlalchemy import JSON as JSONType, cast, func, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.mutable import MutableDict
+from sqlalchemy.orm import deferred
 
 class ExecutionStatus(Enum):
     PENDING = 'pending'
@@ -16,29 +21,74 @@ class ExecutionLogLevel(Enum):
     ERROR = 'error'
     DEBUG = 'debug'
 
+def _json_patch(column, key, value):
+    """SQL expression setting ``column[key] = value`` server-side, or None if unsupported"""
+    dialect = db.session.get_bind().dialect.name
+    payload = json.dumps(value, default=str)
+    if dialect == 'sqlite':
+        return func.json_set(func.coalesce(column, '{}'), f'$.{key}', func.json(payload))
+    if dialect == 'postgresql':
+        patched = func.jsonb_set(func.coalesce(cast(column, JSONB), cast('{}', JSONB)),
+                                 f'{{{key}}}', cast(payload, JSONB))
+        return cast(patched, JSONType)
+    return None
+
+# Valores dos enums resolvidos uma vez; usados nos laços de serialização
+STATUS_VALUES = {member: member.value for member in ExecutionStatus}
+LEVEL_VALUES = {member: member.value for member in ExecutionLogLevel}
+
+# Statuses from which an execution can still be cancelled
+CANCELLABLE_STATUSES = frozenset({ExecutionStatus.PENDING, ExecutionStatus.RUNNING})
+
 class Execution(db.Model):
     __tablename__ = 'executions'
     
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.Enum(ExecutionStatus), default=ExecutionStatus.PENDING, nullable=False)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
     progress = db.Column(db.Float, default=0.0)  # 0.0 to 1.0
-    metadata_ = db.Column('metadata', JSONType)  # Additional execution metadata
+    # MutableDict tracks in-place key changes, so updates don't need a new dict
+    metadata_ = db.Column('metadata', MutableDict.as_mutable(JSONType))  # Additional execution metadata
+    # Texto gerado pela execução; adiado para que listagens não o carreguem
+    final_content = deferred(db.Column(db.Text))
+    
+    __table_args__ = (
+        db.Index('ix_exec_project_started', project_id, started_at.desc()),
+        db.Index('ix_exec_project_status', project_id, status),
+        db.Index('ix_exec_project_status_completed', project_id, status, completed_at.desc()),
+    )
     
     # Relationships
     project = db.relationship('Project', back_populates='executions')
     user = db.relationship('User')
+    # Dynamic so that touching execution.logs never loads the whole history;
+    # ordering by id follows insertion order and uses ix_log_exec_id
     logs = db.relationship('ExecutionLog', back_populates='execution', 
-                          order_by='ExecutionLog.timestamp', 
-                          cascade='all, delete-orphan')
+                          lazy='dynamic',
+                          order_by='ExecutionLog.id', 
+                          cascade='all, delete-orphan',
+                          passive_deletes=True)
     
     def __init__(self, **kwargs):
         super(Execution, self).__init__(**kwargs)
         self.metadata_ = self.metadata_ or {}
     
+    def set_metadata(self, key, value):
+        """Set one metadata key with an in-database JSON update (no commit)"""
+        expr = _json_patch(Execution.metadata_, key, value) if self.id is not None else None
+        if expr is None:
+            if self.metadata_ is None:
+                self.metadata_ = {}
+            self.metadata_[key] = value
+            return
+        db.session.execute(
+            update(Execution).where(Execution.id == self.id).values(metadata_=expr),
+            execution_options={'synchronize_session': 'fetch'}
+        )
+    
     def update_progress(self, progress, commit=True):
         """Update execution progress (0.0 to 1.0)"""
         self.progress = max(0.0, min(1.0, float(progress)))
@@ -46,23 +96,23 @@ class Execution(db.Model):
             db.session.commit()
     
     def add_log(self, message, level=ExecutionLogLevel.INFO, commit=True):
-        """Add a log entry for this execution"""
-        log = ExecutionLog(
-            execution_id=self.id,
-            message=message,
-            level=level
-        )
-        db.session.add(log)
+        """Add a log entry for this execution
+
+        Entries are buffered and bulk-inserted on the next commit, together
+        with any others pending (see app/utils/log_buffer.py); with
+        ``commit=True`` that commit happens now.
+        """
+        log_buffer.enqueue(self.id, message, level)
         if commit:
             db.session.commit()
-        return log
     
-    def start(self):
+    def start(self, commit=True):
         """Mark execution as started"""
         self.status = ExecutionStatus.RUNNING
         self.started_at = datetime.utcnow()
-        self.add_log("Execution started")
-        db.session.commit()
+        self.add_log("Execution started", commit=False)
+        if commit:
+            db.session.commit()
     
     def complete(self, result=None):
         """Mark execution as completed"""
@@ -70,59 +120,61 @@ class Execution(db.Model):
         self.completed_at = datetime.utcnow()
         self.progress = 1.0
         if result is not None:
-            self.metadata_ = {**self.metadata_, 'result': result}
-        self.add_log("Execution completed successfully")
+            self.set_metadata('result', result)
+        self.add_log("Execution completed successfully", commit=False)
         db.session.commit()
     
     def fail(self, error):
         """Mark execution as failed"""
         self.status = ExecutionStatus.FAILED
         self.completed_at = datetime.utcnow()
-        self.metadata_ = {**self.metadata_, 'error': str(error)}
-        self.add_log(f"Execution failed: {error}", ExecutionLogLevel.ERROR)
+        self.set_metadata('error', str(error))
+        self.add_log(f"Execution failed: {error}", ExecutionLogLevel.ERROR, commit=False)
         db.session.commit()
     
     def cancel(self):
         """Cancel the execution"""
-        if self.status in [ExecutionStatus.PENDING, ExecutionStatus.RUNNING]:
+        if self.status in CANCELLABLE_STATUSES:
             self.status = ExecutionStatus.CANCELLED
             self.completed_at = datetime.utcnow()
-            self.add_log("Execution was cancelled", ExecutionLogLevel.WARNING)
+            self.add_log("Execution was cancelled", ExecutionLogLevel.WARNING, commit=False)
             db.session.commit()
     
-    def get_elapsed_time(self):
-        """Get formatted elapsed time since execution started"""
-        if not self.started_at:
-            return '00:00:00'
-            
-        from datetime import datetime
-        end_time = self.completed_at or datetime.utcnow()
-        delta = end_time - self.started_at
-        
-        # Format as HH:MM:SS
-        hours, remainder = divmod(int(delta.total_seconds()), 3600)
+    def _elapsed(self, now):
+        """Whole seconds between started_at and ``now`` (0 if not started)"""
+        return int((now - self.started_at).total_seconds()) if self.started_at else 0
+    
+    @staticmethod
+    def _format_elapsed(seconds):
+        """Format a number of seconds as HH:MM:SS"""
+        hours, remainder = divmod(seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
     
+    def get_elapsed_time(self):
+        """Get formatted elapsed time since execution started"""
+        return self._format_elapsed(self._elapsed(self.completed_at or datetime.utcnow()))
+    
     def get_duration(self):
         """Get total execution duration in seconds"""
-        if not self.started_at:
-            return 0
-            
-        end_time = self.completed_at or datetime.utcnow()
-        return int((end_time - self.started_at).total_seconds())
+        return self._elapsed(self.completed_at or datetime.utcnow())
     
-    def to_dict(self, include_logs=True):
-        """Convert execution to dictionary for JSON serialization"""
+    def to_dict(self, include_logs=True, log_limit=500):
+        """Convert execution to dictionary for JSON serialization
+
+        At most ``log_limit`` of the newest logs are included (all of them if
+        None); ``logs_truncated`` and ``total_log_count`` tell when some were left out.
+        """
+        duration = self._elapsed(self.completed_at or datetime.utcnow())
         result = {
             'id': self.id,
             'project_id': self.project_id,
-            'status': self.status.value,
+            'status': STATUS_VALUES[self.status],
             'progress': self.progress,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'elapsed_time': self.get_elapsed_time(),
-            'duration': self.get_duration(),
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+            'elapsed_time': self._format_elapsed(duration),
+            'duration': duration,
             'metadata': self.metadata_ or {},
             'project': {
                 'id': self.project.id,
@@ -136,19 +188,67 @@ class Execution(db.Model):
         }
         
         if include_logs:
-            result['logs'] = [log.to_dict() for log in self.logs]
+            # Uma linha a mais que o limite indica se houve corte; só então
+            # o total é contado (pelo índice ix_log_exec_id)
+            logs = self.logs_to_dicts(newest=None if log_limit is None else log_limit + 1)
+            truncated = log_limit is not None and len(logs) > log_limit
+            if truncated:
+                logs = logs[1:]
+            result['logs'] = logs
+            result['logs_truncated'] = truncated
+            result['total_log_count'] = self.count_logs() if truncated else len(logs)
             
         return result
+    
+    def get_last_log(self):
+        """Get the most recent log entry, or None"""
+        return self.logs.order_by(None).order_by(ExecutionLog.id.desc()).first()
+    
+    def count_logs(self):
+        """Number of log entries of this execution"""
+        return db.session.query(func.count(ExecutionLog.id))\
+                         .filter(ExecutionLog.execution_id == self.id).scalar()
+    
+    def log_rows(self, after_id=0, newest=None):
+        """Fetch (id, timestamp, level, message) tuples for logs newer than after_id, oldest first
+
+        With ``newest`` only the last ``newest`` of those rows are fetched.
+        """
+        query = db.session.query(ExecutionLog.id, ExecutionLog.timestamp,
+                                 ExecutionLog.level, ExecutionLog.message)\
+                          .filter(ExecutionLog.execution_id == self.id,
+                                  ExecutionLog.id > after_id)
+        if newest is None:
+            return query.order_by(ExecutionLog.id).all()
+        rows = query.order_by(ExecutionLog.id.desc()).limit(newest).all()
+        rows.reverse()
+        return rows
+    
+    def logs_to_dicts(self, after_id=0, newest=None):
+        """Serialize logs like ExecutionLog.to_dict without loading ExecutionLog objects"""
+        execution_id = self.id
+        level_values = LEVEL_VALUES
+        return [{
+            'id': log_id,
+            'execution_id': execution_id,
+            'timestamp': timestamp,
+            'level': level_values[level],
+            'message': message
+        } for log_id, timestamp, level, message in self.log_rows(after_id, newest)]
 
 class ExecutionLog(db.Model):
     __tablename__ = 'execution_logs'
     
     id = db.Column(db.Integer, primary_key=True)
-    execution_id = db.Column(db.Integer, db.ForeignKey('executions.id'), nullable=False)
+    execution_id = db.Column(db.Integer, db.ForeignKey('executions.id', ondelete='CASCADE'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     level = db.Column(db.Enum(ExecutionLogLevel), nullable=False)
     message = db.Column(db.Text, nullable=False)
     
+    __table_args__ = (
+        db.Index('ix_log_exec_id', execution_id, id),
+    )
+    
     # Relationships
     execution = db.relationship('Execution', back_populates='logs')
     
@@ -157,7 +257,7 @@ class ExecutionLog(db.Model):
         return {
             'id': self.id,
             'execution_id': self.execution_id,
-            'timestamp': self.timestamp.isoformat(),
-            'level': self.level.value,
+            'timestamp': self.timestamp,
+            'level': LEVEL_VALUES[self.level],
             'message': self.message
         }
@@ -2,8 +2,20 @@ from datetime import datetime
 from app import db
 from .execution import Execution, ExecutionStatus
 
-# Use JSON for SQLite compatibility
-from sqlalchemy import JSON as JSONType
+# Use JSON for SQLite compatibility; content is JSONB on PostgreSQL
+from sqlalchemy import JSON as JSONType, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.hybrid import hybrid_property
+
+VALID_PROJECT_STATUSES = frozenset({'draft', 'pending', 'in_progress', 'completed', 'archived'})
+
+# Fallback progress (%) by project status when there is no running execution
+_STATUS_PROGRESS = {
+    'draft': 25,
+    'pending': 50,
+    'in_progress': 75,
+    'archived': 0
+}
 
 class Project(db.Model):
     __tablename__ = 'projects'
@@ -12,6 +24,8 @@ class Project(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     status = db.Column(db.String(20), default='draft')  # draft, pending, in_progress, completed, archived
+    # Carimbados em Python: no SQLite todos os valores ficam no mesmo formato
+    # texto (com microssegundos) e comparações/cursores funcionam
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -19,15 +33,36 @@ class Project(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     executions = db.relationship('Execution', back_populates='project', 
                                order_by='desc(Execution.started_at)',
-                               cascade='all, delete-orphan')
+                               cascade='all, delete-orphan',
+                               passive_deletes=True)  # ON DELETE CASCADE no banco
     
     # JSON fields for flexible schema
     settings = db.Column(JSONType, default=dict)  # Stores all wizard settings
-    content = db.Column(JSONType, default=dict)   # Stores generated content
+    content = db.Column(JSONType().with_variant(JSONB, 'postgresql'), default=dict)   # Stores generated content
+    
+    __table_args__ = (
+        # Listagem paginada por cursor em list_projects
+        db.Index('ix_project_user_updated', user_id, updated_at.desc(), id.desc()),
+        # Busca por título/descrição em list_projects (lower(col) LIKE ...);
+        # no PostgreSQL a migração cria estes índices com text_pattern_ops
+        db.Index('ix_project_title_lower', func.lower(title)),
+        db.Index('ix_project_description_lower', func.lower(description)),
+    )
     
     def __repr__(self):
         return f'<Project {self.title}>'
     
+    @hybrid_property
+    def prompt_completed(self):
+        """Whether the wizard prompt of this project was finalized"""
+        content = self.content
+        return bool(content.get('prompt_completed', False)) if isinstance(content, dict) else False
+    
+    @prompt_completed.expression
+    def prompt_completed(cls):
+        # Lido direto no banco (JSON1 no SQLite, ->> no PostgreSQL)
+        return cls.content['prompt_completed'].as_boolean()
+    
     def to_dict(self):
         """Convert project to dictionary for JSON serialization"""
         return {
@@ -44,8 +79,7 @@ class Project(db.Model):
     
     def update_status(self, new_status):
         """Update project status with validation"""
-        valid_statuses = ['draft', 'pending', 'in_progress', 'completed', 'archived']
-        if new_status in valid_statuses:
+        if new_status in VALID_PROJECT_STATUSES:
             self.status = new_status
             self.updated_at = datetime.utcnow()
             return True
@@ -62,29 +96,36 @@ class Project(db.Model):
             return int(active_execution.progress * 100)
         
         # Fallback to simple progress calculation based on status
-        progress_map = {
-            'draft': 25,
-            'pending': 50,
-            'in_progress': 75,
-            'archived': 0
-        }
-        return progress_map.get(self.status, 0)
+        return _STATUS_PROGRESS.get(self.status, 0)
     
     def get_active_execution(self):
         """Get the most recent active execution"""
         return Execution.query.filter_by(
             project_id=self.id,
             status=ExecutionStatus.RUNNING
-        ).order_by(Execution.started_at.desc()).first()
+        ).order_by(Execution.started_at.desc(), Execution.id.desc()).first()
+    
+    def has_active_execution(self):
+        """Return the id of a running execution for this project, or None"""
+        # Só o id: evita montar um objeto Execution para uma checagem de existência
+        return db.session.query(Execution.id).filter_by(
+            project_id=self.id, status=ExecutionStatus.RUNNING
+        ).limit(1).scalar()
     
     def get_last_execution(self):
         """Get the most recent execution"""
+        # The id breaks ties between executions started at the same instant
         return Execution.query.filter_by(
             project_id=self.id
-        ).order_by(Execution.started_at.desc()).first()
+        ).order_by(Execution.started_at.desc(), Execution.id.desc()).first()
     
-    def create_execution(self, user_id, metadata=None):
-        """Create a new execution for this project"""
+    def create_execution(self, user_id, metadata=None, start=False):
+        """Create a new execution for this project
+
+        With ``start=True`` the execution is also marked as started; the
+        execution, its first log entry and the project status change are
+        written in a single commit.
+        """
         execution = Execution(
             project_id=self.id,
             user_id=user_id,
@@ -92,6 +133,11 @@ class Project(db.Model):
         )
         db.session.add(execution)
         
+        if start:
+            # O flush atribui o id usado pelo log inicial, ainda na mesma transação
+            db.session.flush()
+            execution.start(commit=False)
+        
         # Update project status
         self.status = 'in_progress'
         
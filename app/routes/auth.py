@@ -1,6 +1,5 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
 from app.models.user import User
 from app.forms.auth import LoginForm, RegistrationForm
@@ -14,12 +13,11 @@ def register():
         
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_password = generate_password_hash(form.password.data)
         user = User(
             username=form.username.data,
-            email=form.email.data,
-            password_hash=hashed_password
+            email=form.email.data
         )
+        user.set_password(form.password.data)
         db.session.add(user)
         db.session.commit()
         flash('Sua conta foi criada com sucesso! Agora você pode fazer login.', 'success')
@@ -35,7 +33,9 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        if user and check_password_hash(user.password_hash, form.password.data):
+        if user and user.check_password(form.password.data):
+            # Grava o hash refeito por check_password, se houve
+            db.session.commit()
             login_user(user, remember=form.remember_me.data)
             next_page = request.args.get('next')
             return redirect(next_page or url_for('main.dashboard'))
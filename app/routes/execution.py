@@ -1,26 +1,49 @@
-from flask import Blueprint, render_template, jsonify, request, current_app, abort, make_response
+from flask import Blueprint, Response, render_template, jsonify, request, current_app, abort, stream_with_context
 from flask_login import login_required, current_user
 from app import db
 from app.models.project import Project
-from app.models.execution import Execution, ExecutionStatus, ExecutionLogLevel
+from app.models.user import User
+from app.models.execution import Execution, ExecutionLog, ExecutionStatus, ExecutionLogLevel, CANCELLABLE_STATUSES, STATUS_VALUES, LEVEL_VALUES
 from app.utils.decorators import project_required, execution_required
-import json
+from app.utils import log_buffer, progress_throttle
 from datetime import datetime
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('execution', __name__)
 
+# Carrega junto com a execução apenas as colunas do projeto e do usuário
+# que Execution.to_dict usa, em vez de dois SELECTs extras
+_TO_DICT_OPTIONS = (
+    joinedload(Execution.project).load_only(Project.id, Project.title, Project.status),
+    joinedload(Execution.user).load_only(User.id, User.username),
+)
+
 @bp.route('/project/<int:project_id>/execute', methods=['POST'])
 @login_required
 @project_required
 def execute_project(project):
     """Start a new execution for a project"""
     # Check if there's already an active execution
-    active_execution = project.get_active_execution()
-    if active_execution:
+    active_id = project.has_active_execution()
+    if active_id:
         return jsonify({
             'status': 'error',
             'message': 'Já existe uma execução em andamento para este projeto',
-            'execution_id': active_execution.id
+            'execution_id': active_id
+        }), 400
+    
+    # Check if project has completed prompt
+    content_data = project.content or {}
+    if not content_data:
+        return jsonify({
+            'status': 'error',
+            'message': 'Projeto deve ter o prompt concluído antes da execução'
+        }), 400
+    if not project.prompt_completed:
+        return jsonify({
+            'status': 'error',
+            'message': 'O prompt do projeto deve ser finalizado antes de iniciar a execução'
         }), 400
     
     try:
@@ -28,33 +51,7 @@ def execute_project(project):
         execution = project.create_execution(current_user.id, {
             'user_agent': request.headers.get('User-Agent'),
             'ip_address': request.remote_addr
-        })
-        
-        # Check if project has completed prompt
-        if not project.content:
-            return jsonify({
-                'status': 'error',
-                'message': 'Projeto deve ter o prompt concluído antes da execução'
-            }), 400
-            
-        # Parse project content to check completion
-        try:
-            if isinstance(project.content, str):
-                content_data = json.loads(project.content)
-            else:
-                content_data = project.content
-                
-            if not content_data.get('prompt_completed', False):
-                return jsonify({
-                    'status': 'error',
-                    'message': 'O prompt do projeto deve ser finalizado antes de iniciar a execução'
-                }), 400
-        except Exception as e:
-            current_app.logger.error(f"Error parsing project content: {str(e)}")
-            return jsonify({
-                'status': 'error',
-                'message': 'Erro ao validar dados do projeto'
-            }), 400
+        }, start=True)
         
         # Start background AI generation task
         # For now, simulate the task without Celery
@@ -63,7 +60,7 @@ def execute_project(project):
         
         # Update execution with task result
         if task_result.get('status') == 'success':
-            execution.metadata_['generation_completed'] = True
+            execution.set_metadata('generation_completed', True)
             db.session.commit()
             
             return jsonify({
@@ -92,7 +89,7 @@ def execute_project(project):
 
 @bp.route('/execution/<int:execution_id>')
 @login_required
-@execution_required
+@execution_required(options=_TO_DICT_OPTIONS)
 def get_execution(execution):
     """Get execution details"""
     return jsonify(execution.to_dict())
@@ -104,10 +101,10 @@ def get_execution_status(execution):
     """Get execution status"""
     return jsonify({
         'id': execution.id,
-        'status': execution.status.value,
+        'status': STATUS_VALUES[execution.status],
         'progress': execution.progress,
-        'started_at': execution.started_at.isoformat() if execution.started_at else None,
-        'completed_at': execution.completed_at.isoformat() if execution.completed_at else None
+        'started_at': execution.started_at,
+        'completed_at': execution.completed_at
     })
 
 @bp.route('/execution/<int:execution_id>/logs')
@@ -115,15 +112,14 @@ def get_execution_status(execution):
 @execution_required
 def get_execution_logs(execution):
     """Get execution logs"""
-    logs = [log.to_dict() for log in execution.logs]
-    return jsonify(logs)
+    return jsonify(execution.logs_to_dicts())
 
 @bp.route('/execution/<int:execution_id>/cancel', methods=['POST'])
 @login_required
 @execution_required
 def cancel_execution(execution):
     """Cancel an execution"""
-    if execution.status not in [ExecutionStatus.PENDING, ExecutionStatus.RUNNING]:
+    if execution.status not in CANCELLABLE_STATUSES:
         return jsonify({
             'status': 'error',
             'message': 'A execução não pode ser cancelada no estado atual'
@@ -149,10 +145,12 @@ def execution_dashboard(project):
     """Render the execution dashboard"""
     # Get the most recent execution
     execution = project.get_last_execution()
+    log_count = execution.count_logs() if execution else 0
     
     return render_template('execution/dashboard.html', 
                          project=project, 
                          execution=execution,
+                         log_count=log_count,
                          ExecutionStatus=ExecutionStatus)
 
 @bp.route('/project/<int:project_id>/executions')
@@ -160,80 +158,103 @@ def execution_dashboard(project):
 @project_required
 def project_executions(project):
     """List all executions for a project"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    per_page = max(1, request.args.get('per_page', 10, type=int))
+    cursor = request.args.get('cursor', type=datetime.fromisoformat)
+    cursor_id = request.args.get('cursor_id', type=int)
     
-    executions = Execution.query.filter_by(project_id=project.id)\
-                              .order_by(Execution.started_at.desc())\
-                              .paginate(page=page, per_page=per_page, error_out=False)
+    # Paginação por cursor (started_at, id): sem COUNT nem OFFSET, cada
+    # página é uma busca direta em ix_exec_project_started
+    is_first_page = cursor is None or cursor_id is None
+    query = Execution.query.filter_by(project_id=project.id)
+    if not is_first_page:
+        query = query.filter(tuple_(Execution.started_at, Execution.id) < (cursor, cursor_id))
+    executions = query.order_by(Execution.started_at.desc(), Execution.id.desc())\
+                      .limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(executions) > per_page:
+        executions = executions[:per_page]
+        last = executions[-1]
+        next_cursor = {'cursor': last.started_at.isoformat(), 'cursor_id': last.id}
+    
+    # Quantidade de logs da página inteira numa única consulta agrupada
+    log_counts = {}
+    if executions:
+        log_counts = dict(db.session.query(ExecutionLog.execution_id, func.count(ExecutionLog.id))
+                                    .filter(ExecutionLog.execution_id.in_([e.id for e in executions]))
+                                    .group_by(ExecutionLog.execution_id).all())
     
     return render_template('execution/list.html',
                          project=project,
                          executions=executions,
+                         log_counts=log_counts,
+                         next_cursor=next_cursor,
+                         is_first_page=is_first_page,
+                         per_page=per_page,
                          ExecutionStatus=ExecutionStatus)
 
 @bp.route('/<int:execution_id>/status')
 @login_required
 def execution_status(execution_id):
     """Get execution status as JSON"""
-    execution = Execution.query.get_or_404(execution_id)
+    execution = db.get_or_404(Execution, execution_id)
     
     return jsonify({
         'id': execution.id,
-        'status': execution.status.value,
+        'status': STATUS_VALUES[execution.status],
         'progress': execution.progress or 0.0,
-        'started_at': execution.started_at.isoformat() if execution.started_at else None,
-        'completed_at': execution.completed_at.isoformat() if execution.completed_at else None
+        'started_at': execution.started_at,
+        'completed_at': execution.completed_at
     })
 
 @bp.route('/<int:execution_id>/logs')
 @login_required
 def execution_logs(execution_id):
     """Get execution logs as JSON"""
-    execution = Execution.query.get_or_404(execution_id)
+    execution = db.get_or_404(Execution, execution_id)
     after_id = request.args.get('after', 0, type=int)
     
-    logs = [log for log in execution.logs if log.id > after_id]
-    
     return jsonify([{
-        'id': log.id,
-        'timestamp': log.timestamp.isoformat(),
-        'level': log.level.value,
-        'message': log.message
-    } for log in logs])
+        'id': log_id,
+        'timestamp': timestamp,
+        'level': LEVEL_VALUES[level],
+        'message': message
+    } for log_id, timestamp, level, message in execution.log_rows(after_id)])
 
 @bp.route('/<int:execution_id>/logs/download')
 @login_required
 def download_logs(execution_id):
     """Download execution logs as text file"""
-    execution = Execution.query.get_or_404(execution_id)
+    execution = db.get_or_404(Execution, execution_id)
     
-    logs_text = []
-    for log in execution.logs:
-        timestamp = log.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-        logs_text.append(f"[{timestamp}] {log.level.value}: {log.message}")
+    rows = db.session.query(ExecutionLog.timestamp, ExecutionLog.level, ExecutionLog.message)\
+                     .filter_by(execution_id=execution.id)\
+                     .order_by(ExecutionLog.id)\
+                     .yield_per(1000)
     
-    response = make_response('\n'.join(logs_text))
-    response.headers['Content-Type'] = 'text/plain'
-    response.headers['Content-Disposition'] = f'attachment; filename=execution_{execution_id}_logs.txt'
+    # Envia o arquivo linha a linha, sem montar todo o texto em memória
+    def generate():
+        for timestamp, level, message in rows:
+            yield f"[{timestamp:%Y-%m-%d %H:%M:%S}] {LEVEL_VALUES[level]}: {message}\n"
     
-    return response
+    return Response(stream_with_context(generate()), mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename=execution_{execution_id}_logs.txt'
+    })
 
 # Helper function to update execution progress
 def update_execution_progress(execution_id, progress, message=None):
-    """Update execution progress (to be called from background tasks)"""
+    """Update execution progress (to be called from background tasks)
+
+    The value is throttled per execution by app/utils/progress_throttle.py;
+    completion (progress 1.0) is always written.
+    """
     with current_app.app_context():
         try:
-            execution = Execution.query.get(execution_id)
-            if not execution:
-                current_app.logger.error(f'Execution {execution_id} not found')
-                return False
-                
-            execution.update_progress(progress)
+            progress = max(0.0, min(1.0, float(progress)))
+            progress_throttle.record(execution_id, progress)
             if message:
-                execution.add_log(message)
-                
-            db.session.commit()
+                log_buffer.enqueue(execution_id, message, ExecutionLogLevel.INFO)
+                db.session.commit()
             return True
             
         except Exception as e:
@@ -1,18 +1,41 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, send_file
+from flask import render_template, redirect, url_for, flash, request, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
-from app import db
+from app import db, cache
 from app.models.project import Project
-from app.models.execution import Execution, ExecutionStatus
+from app.models.execution import Execution, ExecutionLog, ExecutionStatus
 from app.forms.project import ProjectForm, ProjectSettingsForm
+from app.utils.decorators import get_owned_project
 from datetime import datetime, timedelta
 import os
-import json
-from io import BytesIO
-from zipfile import ZipFile
+import orjson
+from sqlalchemy import select, tuple_
+from itertools import groupby
+from operator import itemgetter
+from zipfile import ZipFile, ZIP_DEFLATED
+from zipstream import ZipStream
 
-bp = Blueprint('projects', __name__)
+# URL rules for these views are declared in app/_lazy_bp.py
+
+# Limites da importação de projetos (bytes descompactados e razão de compressão)
+MAX_IMPORT_JSON_SIZE = 5_000_000
+MAX_IMPORT_TOTAL_SIZE = 50_000_000
+MAX_IMPORT_RATIO = 100
+
+# Configurações avançadas padrão de um projeto
+_ADVANCED_DEFAULTS = {
+    'auto_save': True,
+    'notifications': True,
+    'export_format': 'markdown',
+    'api_access': False
+}
+
+# Colunas de ordenação de list_projects e como ler o cursor de cada uma
+_SORT_COLUMNS = {
+    'title': (Project.title, str),
+    'created': (Project.created_at, datetime.fromisoformat),
+    'updated': (Project.updated_at, datetime.fromisoformat),
+}
 
-@bp.route('/list')
 @login_required
 def list_projects():
     """Lista todos os projetos do usuário"""
@@ -26,71 +49,88 @@ def list_projects():
         query = query.filter_by(status=status)
     
     if search:
-        search = f"%{search}%"
-        query = query.filter(Project.title.ilike(search) | Project.description.ilike(search))
+        # lower(col) LIKE pode usar os índices de expressão ix_project_*_lower,
+        # ao contrário de ILIKE
+        pattern = f"%{search.lower()}%"
+        query = query.filter(db.func.lower(Project.title).like(pattern) |
+                             db.func.lower(Project.description).like(pattern))
     
     # Ordenação
     sort = request.args.get('sort', 'updated')
     order = request.args.get('order', 'desc')
-    
-    if sort == 'title':
-        query = query.order_by(Project.title.asc() if order == 'asc' else Project.title.desc())
-    elif sort == 'created':
-        query = query.order_by(Project.created_at.asc() if order == 'asc' else Project.created_at.desc())
-    else:  # updated
-        query = query.order_by(Project.updated_at.asc() if order == 'asc' else Project.updated_at.desc())
-    
-    # Paginação
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-    projects = query.paginate(page=page, per_page=per_page, error_out=False)
+    if sort not in _SORT_COLUMNS:
+        sort = 'updated'
+    column, parse_cursor = _SORT_COLUMNS[sort]
+    descending = order != 'asc'
+    
+    # Paginação por cursor (valor da ordenação, id): sem COUNT nem OFFSET
+    per_page = max(1, request.args.get('per_page', 10, type=int))
+    after = request.args.get('after', type=parse_cursor)
+    after_id = request.args.get('after_id', type=int)
+    is_first_page = after is None or after_id is None
+    if not is_first_page:
+        key = tuple_(column, Project.id)
+        query = query.filter(key < (after, after_id) if descending else key > (after, after_id))
+    
+    if descending:
+        query = query.order_by(column.desc(), Project.id.desc())
+    else:
+        query = query.order_by(column.asc(), Project.id.asc())
+    projects = query.limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(projects) > per_page:
+        projects = projects[:per_page]
+        last = projects[-1]
+        value = getattr(last, column.key)
+        next_cursor = {
+            'after': value.isoformat() if isinstance(value, datetime) else value,
+            'after_id': last.id
+        }
     
     return render_template('projects/list.html', 
                          projects=projects,
+                         next_cursor=next_cursor,
+                         is_first_page=is_first_page,
+                         per_page=per_page,
                          status=status,
                          search=search,
                          sort=sort,
                          order=order)
 
-@bp.route('/projects/<int:project_id>')
 @login_required
 def view_project(project_id):
     """Visualiza um projeto específico"""
-    project = Project.query.get_or_404(project_id)
-    
-    # Verifica se o usuário tem permissão
-    if project.user_id != current_user.id and not current_user.is_admin:
-        abort(403)
-    
-    # Obtém as execuções mais recentes
-    recent_executions = Execution.query.filter_by(project_id=project_id)\
-                                     .order_by(Execution.started_at.desc())\
-                                     .limit(5).all()
-    
-    # Check if prompt is completed and parse content
-    prompt_completed = False
-    content_data = {}
-    if project.content:
-        try:
-            if isinstance(project.content, str):
-                content_data = json.loads(project.content)
-            else:
-                content_data = project.content
-            
-            if isinstance(content_data, dict):
-                prompt_completed = content_data.get('prompt_completed', False)
-        except Exception as e:
-            current_app.logger.error(f"Error parsing project content: {str(e)}")
-            content_data = {}
-            prompt_completed = False
+    project = get_owned_project(project_id)
+    
+    # As 5 execuções mais recentes e, por funções de janela (calculadas
+    # antes do LIMIT), os totais do projeto: tudo numa só consulta
+    rows = db.session.query(
+        Execution,
+        db.func.count(Execution.id).over(),
+        db.func.count(db.case((Execution.status == ExecutionStatus.COMPLETED, 1))).over(),
+        db.func.avg(_duration_seconds()).over()
+    ).filter(Execution.project_id == project_id)\
+     .order_by(Execution.started_at.desc(), Execution.id.desc())\
+     .limit(5).all()
+    recent_executions = [row[0] for row in rows]
+    total, completed, avg_duration = rows[0][1:] if rows else (0, 0, None)
+    execution_stats = {
+        'total': total,
+        'success_rate': completed / total * 100 if total else 0,
+        'average_duration': avg_duration
+    }
+    
+    # content já chega do banco como dict (JSON/JSONB)
+    content_data = project.content or {}
     
     return render_template('projects/view.html', 
                          project=project,
                          content_data=content_data,
                          recent_executions=recent_executions,
-                         prompt_completed=prompt_completed)
+                         execution_stats=execution_stats,
+                         prompt_completed=project.prompt_completed)
 
-@bp.route('/projects/new', methods=['GET', 'POST'])
 @login_required
 def new_project():
     """Cria um novo projeto"""
@@ -119,15 +159,10 @@ def new_project():
                          form=form)
 
 
-@bp.route('/projects/<int:project_id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit_project(project_id):
     """Edita um projeto existente"""
-    project = Project.query.get_or_404(project_id)
-    
-    # Verifica se o usuário tem permissão
-    if project.user_id != current_user.id and not current_user.is_admin:
-        abort(403)
+    project = get_owned_project(project_id, defer_content=True)
     
     form = ProjectForm(obj=project)
     
@@ -163,33 +198,23 @@ def edit_project(project_id):
                          form=form,
                          project=project)
 
-@bp.route('/projects/<int:project_id>/settings', methods=['GET', 'POST'])
 @login_required
 def project_settings(project_id):
     """Configurações avançadas do projeto"""
-    project = Project.query.get_or_404(project_id)
-    
-    # Verifica se o usuário tem permissão
-    if project.user_id != current_user.id and not current_user.is_admin:
-        abort(403)
+    project = get_owned_project(project_id, defer_content=True)
     
     # Handle reset settings
     if request.method == 'POST' and 'reset_settings' in request.form:
         # Reset to default settings
-        project.settings = {
-            'advanced': {
-                'auto_save': True,
-                'notifications': True,
-                'export_format': 'markdown',
-                'api_access': False
-            }
-        }
+        project.settings = {'advanced': dict(_ADVANCED_DEFAULTS)}
         project.updated_at = datetime.utcnow()
         db.session.commit()
         flash('Configurações redefinidas para os valores padrão!', 'success')
         return redirect(url_for('projects.project_settings', project_id=project.id))
     
-    form = ProjectSettingsForm(obj=project)
+    # Valores salvos sobre os padrões; num POST os dados enviados prevalecem
+    advanced = {**_ADVANCED_DEFAULTS, **(project.settings or {}).get('advanced', {})}
+    form = ProjectSettingsForm(obj=project, data=advanced)
     
     if form.validate_on_submit():
         # Atualiza as configurações
@@ -211,96 +236,96 @@ def project_settings(project_id):
         flash('Configurações atualizadas com sucesso!', 'success')
         return redirect(url_for('projects.project_settings', project_id=project.id))
     
-    # Preenche o formulário com os dados atuais
-    if project.settings and 'advanced' in project.settings:
-        form.auto_save.data = project.settings['advanced'].get('auto_save', True)
-        form.notifications.data = project.settings['advanced'].get('notifications', True)
-        form.export_format.data = project.settings['advanced'].get('export_format', 'markdown')
-        form.api_access.data = project.settings['advanced'].get('api_access', False)
-    
     return render_template('projects/settings.html', 
                          title='Configurações do Projeto',
                          form=form,
                          project=project)
 
-@bp.route('/projects/<int:project_id>/delete', methods=['POST'])
 @login_required
 def delete_project(project_id):
     """Exclui um projeto"""
-    project = Project.query.get_or_404(project_id)
+    project = get_owned_project(project_id, defer_content=True)
     
-    # Verifica se o usuário tem permissão
-    if project.user_id != current_user.id and not current_user.is_admin:
-        abort(403)
-    
-    # Remove todas as execuções e logs associados
-    executions = Execution.query.filter_by(project_id=project_id).all()
-    for execution in executions:
-        db.session.delete(execution)
-    
-    # Remove o projeto
+    # Remove o projeto; execuções e logs saem junto pelo ON DELETE CASCADE
     db.session.delete(project)
     db.session.commit()
     
     flash('Projeto excluído com sucesso!', 'success')
     return redirect(url_for('projects.list_projects'))
 
-@bp.route('/projects/<int:project_id>/export')
 @login_required
 def export_project(project_id):
     """Exporta um projeto para um arquivo ZIP"""
-    project = Project.query.get_or_404(project_id)
-    
-    # Verifica se o usuário tem permissão
-    if project.user_id != current_user.id and not current_user.is_admin:
-        abort(403)
-    
-    # Cria um arquivo ZIP em memória
-    memory_file = BytesIO()
-    
-    with ZipFile(memory_file, 'w') as zf:
-        # Adiciona os metadados do projeto
-        project_data = {
-            'title': project.title,
-            'description': project.description,
-            'status': project.status,
-            'created_at': project.created_at.isoformat(),
-            'updated_at': project.updated_at.isoformat(),
-            'settings': project.settings,
-            'content': project.content
-        }
-        
-        zf.writestr('project.json', json.dumps(project_data, indent=2, default=str))
-        
-        # Adiciona os logs de execução
-        executions = Execution.query.filter_by(project_id=project_id).all()
-        for i, execution in enumerate(executions):
-            execution_data = {
-                'id': execution.id,
-                'status': execution.status.value,
-                'started_at': execution.started_at.isoformat() if execution.started_at else None,
-                'completed_at': execution.completed_at.isoformat() if execution.completed_at else None,
-                'progress': execution.progress,
-                'metadata': execution.metadata_,
-                'logs': [{
-                    'timestamp': log.timestamp.isoformat(),
-                    'level': log.level.value,
-                    'message': log.message
-                } for log in execution.logs]
-            }
-            
-            zf.writestr(f'executions/execution_{i+1}.json', json.dumps(execution_data, indent=2, default=str))
-    
-    memory_file.seek(0)
-    
-    return send_file(
-        memory_file,
-        mimetype='application/zip',
-        as_attachment=True,
-        download_name=f'project_{project.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip'
-    )
+    project = get_owned_project(project_id)
+    
+    project_data = {
+        'title': project.title,
+        'description': project.description,
+        'status': project.status,
+        'created_at': project.created_at,
+        'updated_at': project.updated_at,
+        'settings': project.settings,
+        'content': project.content,
+        # O texto gerado fica nas execuções; o da última concluída acompanha o
+        # projeto para que a importação o restaure
+        'final_content': db.session.query(Execution.final_content).filter_by(
+            project_id=project_id, status=ExecutionStatus.COMPLETED
+        ).order_by(Execution.completed_at.desc(), Execution.id.desc()).limit(1).scalar()
+    }
+    # Uma consulta para as execuções e outra, lida em lotes, para os logs de
+    # todas elas (Execution.logs é dinâmico e não aceita selectinload);
+    # ambas em ordem de execução, para serem percorridas juntas
+    executions = db.session.query(Execution.id, Execution.status, Execution.started_at,
+                                  Execution.completed_at, Execution.progress, Execution.metadata_,
+                                  Execution.final_content)\
+                           .filter_by(project_id=project_id).order_by(Execution.id).all()
+    log_rows = db.session.query(ExecutionLog.execution_id, ExecutionLog.timestamp,
+                                ExecutionLog.level, ExecutionLog.message)\
+                         .join(Execution).filter(Execution.project_id == project_id)\
+                         .order_by(ExecutionLog.execution_id, ExecutionLog.id)\
+                         .yield_per(1000)
+    log_groups = groupby(log_rows, key=itemgetter(0))
+    current_group = list(next(log_groups, (None, None)))
+    
+    # O ZIP é gerado enquanto é enviado: os logs de cada execução só são
+    # lidos quando o zipstream chega ao arquivo dela
+    zs = ZipStream(compress_type=ZIP_DEFLATED)
+    zs.add(orjson.dumps(project_data, option=orjson.OPT_INDENT_2), 'project.json')
+    for i, execution in enumerate(executions, 1):
+        zs.add(_export_execution(execution, log_groups, current_group),
+               f'executions/execution_{i}.json')
+    
+    filename = f"project_{project.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(stream_with_context(zs), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename={filename}'
+    })
+
+def _export_execution(execution, log_groups, current_group):
+    """Yield the JSON document of one execution for the project ZIP
+
+    ``current_group`` holds the (execution_id, rows) pair of ``log_groups``
+    not consumed yet and is advanced up to this execution.
+    """
+    while current_group[0] is not None and current_group[0] < execution.id:
+        current_group[:] = next(log_groups, (None, None))
+    logs = current_group[1] if current_group[0] == execution.id else ()
+    
+    execution_data = {
+        'id': execution.id,
+        'status': execution.status.value,
+        'started_at': execution.started_at,
+        'completed_at': execution.completed_at,
+        'progress': execution.progress,
+        'metadata': execution.metadata_,
+        'final_content': execution.final_content,
+        'logs': [{
+            'timestamp': timestamp,
+            'level': level.value,
+            'message': message
+        } for _, timestamp, level, message in logs]
+    }
+    yield orjson.dumps(execution_data, option=orjson.OPT_INDENT_2)
 
-@bp.route('/projects/import', methods=['GET', 'POST'])
 @login_required
 def import_project():
     """Importa um projeto a partir de um arquivo ZIP"""
@@ -318,15 +343,29 @@ def import_project():
         if file and file.filename.endswith('.zip'):
             try:
                 # Lê o arquivo ZIP
-                with ZipFile(file) as zf:
+                with ZipFile(file, 'r') as zf:
                     # Verifica se o arquivo project.json existe
                     if 'project.json' not in zf.namelist():
                         flash('Arquivo de projeto inválido', 'error')
                         return redirect(request.url)
                     
-                    # Lê os dados do projeto
-                    with zf.open('project.json') as f:
-                        project_data = json.loads(f.read().decode('utf-8'))
+                    # Recusa arquivos grandes demais antes de descompactar
+                    # qualquer coisa (tamanhos declarados no diretório do ZIP)
+                    info = zf.getinfo('project.json')
+                    if (info.file_size > MAX_IMPORT_JSON_SIZE
+                            or sum(zi.file_size for zi in zf.infolist()) > MAX_IMPORT_TOTAL_SIZE
+                            or info.file_size > MAX_IMPORT_RATIO * max(info.compress_size, 1)):
+                        flash('Arquivo de projeto grande demais', 'error')
+                        return redirect(request.url)
+                    
+                    # Lê os dados do projeto; o limite na leitura vale mesmo
+                    # se o tamanho declarado for falso
+                    with zf.open(info) as f:
+                        raw = f.read(MAX_IMPORT_JSON_SIZE + 1)
+                    if len(raw) > MAX_IMPORT_JSON_SIZE:
+                        flash('Arquivo de projeto grande demais', 'error')
+                        return redirect(request.url)
+                    project_data = orjson.loads(raw)
                 
                 # Cria um novo projeto
                 project = Project(
@@ -339,6 +378,20 @@ def import_project():
                 )
                 
                 db.session.add(project)
+                
+                # O texto gerado volta numa execução concluída, onde as
+                # páginas de resultado o procuram
+                final_content = project_data.get('final_content')
+                if final_content is not None:
+                    db.session.add(Execution(
+                        project=project,
+                        user_id=current_user.id,
+                        status=ExecutionStatus.COMPLETED,
+                        completed_at=datetime.utcnow(),
+                        progress=1.0,
+                        final_content=final_content,
+                        metadata_={'imported': True}
+                    ))
                 db.session.commit()
                 
                 flash('Projeto importado com sucesso!', 'success')
@@ -354,51 +407,58 @@ def import_project():
     
     return render_template('projects/import.html', title='Importar Projeto')
 
-@bp.route('/api/projects/<int:project_id>/stats')
 @login_required
 def project_stats(project_id):
     """Retorna estatísticas do projeto"""
-    project = Project.query.get_or_404(project_id)
-    
-    # Verifica se o usuário tem permissão
-    if project.user_id != current_user.id and not current_user.is_admin:
-        abort(403)
-    
-    # Conta as execuções por status
-    executions = db.session.query(
-        Execution.status,
-        db.func.count(Execution.id).label('count')
-    ).filter_by(project_id=project_id).group_by(Execution.status).all()
-    
-    # Calcula o tempo médio de execução
-    avg_duration = db.session.query(
-        db.func.avg(
-            db.func.extract('epoch', Execution.completed_at - Execution.started_at)
-        )
-    ).filter(
-        Execution.project_id == project_id,
-        Execution.status == 'completed',
-        Execution.completed_at.isnot(None),
-        Execution.started_at.isnot(None)
-    ).scalar() or 0
-    
-    # Últimas execuções
-    recent_executions = Execution.query.filter_by(project_id=project_id)\
-                                     .order_by(Execution.started_at.desc())\
-                                     .limit(5).all()
-    
-    return jsonify({
+    project = get_owned_project(project_id, defer_content=True)
+    
+    return jsonify(_project_stats(project_id, project.updated_at))
+
+def _duration_seconds():
+    """SQL expression for completed_at - started_at in seconds"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return (db.func.julianday(Execution.completed_at) -
+                db.func.julianday(Execution.started_at)) * 86400
+    return db.func.extract('epoch', Execution.completed_at - Execution.started_at)
+
+# As estatísticas só mudam quando uma execução termina; a chave inclui
+# updated_at e o resultado vale por 30 segundos
+@cache.memoize(30)
+def _project_stats(project_id, updated_at):
+    """Execution counts, average duration and recent executions of a project"""
+    # Contagem e duração média por status numa única consulta; a média do
+    # grupo COMPLETED é a duração média das execuções concluídas
+    by_status = db.session.execute(
+        select(Execution.status,
+               db.func.count(Execution.id),
+               db.func.avg(_duration_seconds()))
+        .where(Execution.project_id == project_id)
+        .group_by(Execution.status)
+    ).all()
+    
+    avg_duration = next((avg for status, _, avg in by_status
+                         if status == ExecutionStatus.COMPLETED), None) or 0
+    
+    # Últimas execuções (linhas Core, sem objetos do ORM)
+    recent_executions = db.session.execute(
+        select(Execution.id, Execution.status, Execution.started_at, Execution.completed_at)
+        .where(Execution.project_id == project_id)
+        .order_by(Execution.started_at.desc())
+        .limit(5)
+    ).all()
+    
+    return {
         'project_id': project_id,
         'executions': {
-            'total': sum(e.count for e in executions),
-            'by_status': {e.status.value: e.count for e in executions}
+            'total': sum(count for _, count, _ in by_status),
+            'by_status': {status.value: count for status, count, _ in by_status}
         },
         'average_duration': round(float(avg_duration), 2),
-        'last_updated': project.updated_at.isoformat(),
+        'last_updated': updated_at.isoformat(),
         'recent_executions': [{
-            'id': e.id,
-            'status': e.status.value,
-            'started_at': e.started_at.isoformat(),
-            'duration': (e.completed_at - e.started_at).total_seconds() if e.completed_at and e.started_at else None
-        } for e in recent_executions]
-    })
+            'id': execution_id,
+            'status': status.value,
+            'started_at': started_at.isoformat(),
+            'duration': (completed_at - started_at).total_seconds() if completed_at and started_at else None
+        } for execution_id, status, started_at, completed_at in recent_executions]
+    }
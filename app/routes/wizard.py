@@ -1,29 +1,47 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session, current_app
+from flask import render_template, redirect, url_for, flash, request, session, current_app
 from flask_login import login_required, current_user
 from app.forms.wizard import *
 from app.models.project import Project
-from app import db
-import json
+from app import db, wizard_cache
 from datetime import datetime
 
-bp = Blueprint('wizard', __name__)
+# URL rules for these views are declared in app/_lazy_bp.py
+
+# Os dados do assistente ficam num armazenamento compartilhado do servidor
+# (wizard_cache: Redis ou arquivos), não no cookie de sessão nem na memória
+# de um worker: o cookie só guarda o id do projeto em edição
+WIZARD_DATA_TIMEOUT = 3600
+
+def _wizard_key(project_id):
+    return f'wizard:{current_user.id}:{project_id or "new"}'
+
+def _load_wizard_data(project_id):
+    """Wizard data stored for the current user and project, or None"""
+    return wizard_cache.get(_wizard_key(project_id))
+
+def _store_wizard_data(project_id, wizard_data):
+    wizard_cache.set(_wizard_key(project_id), wizard_data, timeout=WIZARD_DATA_TIMEOUT)
+
+def _clear_wizard_data(project_id):
+    wizard_cache.delete(_wizard_key(project_id))
+
+_FORM_CLASSES = {
+    1: WizardStep1Form,
+    2: WizardStep2Form,
+    3: WizardStep3Form,
+    4: WizardStep4Form,
+    5: WizardStep5Form,
+    6: WizardReviewForm
+}
 
 def get_form_class(step):
     """Return the appropriate form class for the current step"""
-    form_classes = {
-        1: WizardStep1Form,
-        2: WizardStep2Form,
-        3: WizardStep3Form,
-        4: WizardStep4Form,
-        5: WizardStep5Form,
-        6: WizardReviewForm
-    }
-    return form_classes.get(step, WizardStep1Form)
+    return _FORM_CLASSES.get(step, WizardStep1Form)
 
 def save_project(draft=False, project_id=None):
-    """Save project to database and clear session"""
+    """Save project to database and clear the wizard data"""
     try:
-        wizard_data = session.get('wizard_data', {})
+        wizard_data = _load_wizard_data(project_id) or {}
         
         # Mark prompt as completed if not saving as draft
         if not draft:
@@ -31,8 +49,8 @@ def save_project(draft=False, project_id=None):
         
         if project_id:
             # Update existing project
-            project = Project.query.get_or_404(project_id)
-            project.content = json.dumps(wizard_data)
+            project = Project.query.filter_by(id=project_id, user_id=current_user.id).first_or_404()
+            project.content = wizard_data
             project.is_draft = draft
             project.status = 'draft' if draft else 'pending'
             project.updated_at = datetime.utcnow()
@@ -41,7 +59,7 @@ def save_project(draft=False, project_id=None):
             project = Project(
                 user_id=current_user.id,
                 title=wizard_data.get('project_title', 'Novo Projeto'),
-                content=json.dumps(wizard_data),
+                content=wizard_data,
                 is_draft=draft,
                 status='draft' if draft else 'pending'
             )
@@ -49,11 +67,9 @@ def save_project(draft=False, project_id=None):
         
         db.session.commit()
         
-        # Clear session data
-        if 'wizard_data' in session:
-            del session['wizard_data']
-        if 'current_project_id' in session:
-            del session['current_project_id']
+        # Clear wizard data
+        _clear_wizard_data(project_id)
+        session.pop('current_project_id', None)
             
         flash('Projeto salvo com sucesso!', 'success')
         return redirect(url_for('projects.view_project', project_id=project.id))
@@ -67,84 +83,55 @@ def save_project(draft=False, project_id=None):
         else:
             return redirect(url_for('projects.projects'))
 
-@bp.route('/new', methods=['GET', 'POST'])
-@bp.route('/new/<int:project_id>', methods=['GET', 'POST'])
 @login_required
 def new_project(project_id=None):
     """Single-page wizard for project creation"""
     # Check if we have a project_id or need to create one
     project = None
-    prompt_completed = False
     
     if project_id:
         # Load existing project
-        project = Project.query.get_or_404(project_id)
-        if project.user_id != current_user.id:
+        # O filtro por dono faz parte da consulta: projetos de outros
+        # usuários nem chegam a ser carregados
+        project = Project.query.filter_by(id=project_id, user_id=current_user.id).first()
+        if project is None:
             flash('Acesso negado a este projeto.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        # Check if prompt is completed
-        content_data = {}
-        if project.content:
-            try:
-                if isinstance(project.content, str):
-                    content_data = json.loads(project.content)
-                else:
-                    content_data = project.content
-                
-                if isinstance(content_data, dict):
-                    prompt_completed = content_data.get('prompt_completed', False)
-            except Exception as e:
-                current_app.logger.error(f"Error parsing project content: {str(e)}")
-                content_data = {}
+        content_data = project.content or {}
+        prompt_completed = project.prompt_completed
         
-        # Load project data into session
-        session['wizard_data'] = content_data
         session['current_project_id'] = project_id
     else:
         # Redirect to project creation first
         flash('Primeiro você precisa criar um projeto.', 'info')
         return redirect(url_for('projects.new_project'))
     
-    # Initialize session data
-    if 'wizard_data' not in session:
-        session['wizard_data'] = {}
+    # Um rascunho guardado após uma validação com erro tem precedência sobre
+    # o conteúdo salvo no projeto
+    wizard_data = _load_wizard_data(project_id) or content_data
     
-    # Create a combined form with all steps
+    # Create a combined form with all steps; on POST the submitted values
+    # take precedence over wizard_data
     from app.forms.wizard import CombinedWizardForm
-    form = CombinedWizardForm()
-    
-    # Populate form with existing data
-    wizard_data = session.get('wizard_data', {})
-    for field_name in form._fields:
-        if field_name in wizard_data and hasattr(form, field_name):
-            getattr(form, field_name).data = wizard_data[field_name]
+    form = CombinedWizardForm(data=wizard_data)
         
     # Handle form submission
     if request.method == 'POST':
+        form_data = {name: field.data for name, field in form._fields.items()
+                     if name != 'csrf_token'}
         if form.validate_on_submit():
-            # Save form data to session
-            form_data = {}
-            for field_name in form._fields:
-                if field_name not in ['csrf_token'] and hasattr(form, field_name):
-                    field = getattr(form, field_name)
-                    if hasattr(field, 'data'):
-                        form_data[field_name] = field.data
-            
-            # Check if prompt should be marked as completed
-            if 'prompt_completed' in request.form or 'submit' in request.form:
-                form_data['prompt_completed'] = True
-            
-            # Update session
-            session['wizard_data'] = {**session.get('wizard_data', {}), **form_data}
-            session.modified = True
+            # Check if prompt should be marked as completed (a draft save clears it)
+            form_data['prompt_completed'] = 'prompt_completed' in request.form or 'submit' in request.form
             
-            # Save to project
+            # Save to project, keeping keys the form does not own
+            # (e.g. generated content)
             if project:
                 try:
-                    project.content = form_data
+                    project.content = {**content_data, **form_data}
                     project.updated_at = datetime.now()
                     db.session.commit()
+                    _clear_wizard_data(project_id)
                     
                     if form_data.get('prompt_completed'):
                         flash('Projeto finalizado com sucesso!', 'success')
@@ -158,6 +145,8 @@ def new_project(project_id=None):
                     current_app.logger.error(f"Error saving project: {str(e)}")
                     flash('Erro ao salvar o projeto. Tente novamente.', 'error')
         else:
+            # Só aqui o store é usado: guarda o que foi digitado até a correção
+            _store_wizard_data(project_id, {**wizard_data, **form_data})
             flash('Por favor, corrija os erros no formulário antes de continuar.', 'error')
     
     # Render the single-page wizard
@@ -0,0 +1,33 @@
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+
+# Hash de senhas do projeto (argon2id, parâmetros padrão do argon2-cffi)
+_hasher = PasswordHasher()
+
+# Prefixos dos hashes gerados anteriormente pelo Werkzeug
+_WERKZEUG_PREFIXES = ('pbkdf2:', 'scrypt:')
+
+def hash_password(password):
+    """Return an argon2 hash for the given password"""
+    return _hasher.hash(password)
+
+def verify_password(password_hash, password):
+    """Check a password against an argon2 hash or a legacy Werkzeug hash"""
+    if not password_hash:
+        return False
+    if password_hash.startswith(_WERKZEUG_PREFIXES):
+        return check_password_hash(password_hash, password)
+    try:
+        return _hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def needs_rehash(password_hash):
+    """Whether a stored hash is a legacy Werkzeug hash or uses outdated argon2 parameters"""
+    if password_hash.startswith(_WERKZEUG_PREFIXES):
+        return True
+    try:
+        return _hasher.check_needs_rehash(password_hash)
+    except InvalidHashError:
+        return True
@@ -2,23 +2,239 @@
 Background tasks for AI content generation using the multi-agent system
 """
 import os
-import sys
-import json
+import orjson
+import threading
 from datetime import datetime
 from typing import Dict, Any
 
-# Add project root to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
 from app import db, create_app
 from app.models.project import Project
 from app.models.execution import Execution, ExecutionStatus
+from app.tasks import llm_cache
+from app.utils import log_buffer, progress_throttle
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
+from sqlalchemy.orm.attributes import flag_modified
+from main import LLMProvider, AutonoWriteSystem, TransientLLMError
 
 # Initialize Celery
 celery = Celery('autonowrite')
+# A geração passa quase todo o tempo esperando o LLM: um pool de threads
+# mantém várias tarefas em andamento por processo worker
+celery.conf.update(
+    worker_pool=os.getenv('CELERY_WORKER_POOL', 'threads'),
+    worker_concurrency=int(os.getenv('CELERY_WORKER_CONCURRENCY', '8')),
+    # Tarefas longas: cada thread reserva só a próxima mensagem, para que
+    # gerações enfileiradas não fiquem presas atrás de um worker ocupado
+    worker_prefetch_multiplier=1,
+)
+
+_PROVIDER_TYPES = {"groq", "ollama", "simulation", "auto"}
+
+# Descrição do nível técnico escolhido no wizard, usada no tópico
+_LEVEL_MAP = {
+    'iniciante': 'nível iniciante',
+    'intermediario': 'nível intermediário',
+    'avancado': 'nível avançado',
+    'academico': 'nível acadêmico'
+}
+
+# Providers LLM reaproveitados entre tarefas do mesmo processo, por tipo:
+# o cliente HTTP (Groq) e o modelo baixado (Ollama) são criados uma única vez
+_PROVIDER_CACHE: Dict[str, Any] = {}
+_PROVIDER_LOCK = threading.Lock()
+
+def _configured_provider_type() -> str:
+    """
+    Provider type requested through LLM_PROVIDER, falling back to auto
+    """
+    provider_env = os.getenv("LLM_PROVIDER", "auto").strip().lower()
+    return provider_env if provider_env in _PROVIDER_TYPES else "auto"
+
+def _get_llm_provider(provider_type: str):
+    """
+    Return the process-wide LLMProvider for provider_type, creating it on first use
+    """
+    provider = _PROVIDER_CACHE.get(provider_type)
+    if provider is None:
+        with _PROVIDER_LOCK:
+            provider = _PROVIDER_CACHE.get(provider_type)
+            if provider is None:
+                # Uma falha aqui não é memorizada: a próxima tarefa tenta de novo
+                provider = LLMProvider(provider_type=provider_type)
+                _PROVIDER_CACHE[provider_type] = provider
+    return provider
+
+class _RunProvider:
+    """
+    Per-run view of a shared LLMProvider that counts only this run's calls
+    """
+    def __init__(self, provider: LLMProvider):
+        self._provider = provider
+        # Cada execução roda numa única thread: o contador não precisa de lock
+        self.call_count = 0
+    
+    def generate(self, prompt: str, max_tokens: int = 1500) -> str:
+        self.call_count += 1
+        return self._provider.generate(prompt, max_tokens)
+    
+    def __getattr__(self, name):
+        return getattr(self._provider, name)
 
-@celery.task(bind=True)
+def _is_prefork(pool_cls) -> bool:
+    """
+    Whether a worker pool (alias or class) forks child processes
+    """
+    name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, '__module__', '')
+    return name.rsplit('.', 1)[-1].rsplit(':', 1)[0] in ('prefork', 'processes')
+
+@worker_init.connect
+def _prewarm_in_worker(sender=None, **kwargs):
+    """
+    Create the configured provider when a threads/solo worker starts
+    """
+    # No prefork o processo principal não executa tarefas e um cliente HTTP
+    # criado antes do fork não deve ser herdado pelos filhos
+    pool_cls = getattr(sender, 'pool_cls', None) or celery.conf.worker_pool
+    if not _is_prefork(pool_cls):
+        _prewarm_llm_provider()
+
+@worker_process_init.connect
+def _prewarm_llm_provider(**kwargs):
+    """
+    Create the configured provider when a worker process starts
+    """
+    try:
+        _get_llm_provider(_configured_provider_type())
+    except Exception:
+        # A primeira tarefa registra o erro e recorre à simulação
+        pass
+
+def _run_generation(execution_id: int, project_id: int) -> Dict[str, Any]:
+    """
+    Run the multi-agent pipeline for an execution and save the result on its project
+
+    Errors propagate; callers decide how to record them and whether to retry.
+    """
+    # Get execution and project
+    execution = db.session.get(Execution, execution_id)
+    project = db.session.get(Project, project_id)
+    
+    if not execution or not project:
+        raise LookupError("Execution or project not found")
+    
+    # Execuções enfileiradas (PENDING) ou numa nova tentativa (FAILED)
+    # voltam a RUNNING
+    if execution.status != ExecutionStatus.RUNNING:
+        execution.start(commit=False)
+    execution.add_log("Iniciando geração de conteúdo com sistema multiagente", "INFO", commit=False)
+    
+    # Parse project content to get wizard data
+    if isinstance(project.content, (str, bytes)):
+        wizard_data = orjson.loads(project.content)
+    else:
+        wizard_data = project.content
+    
+    # Choose provider based on environment and availability
+    provider_env = os.getenv("LLM_PROVIDER", "auto").strip().lower()
+    try:
+        llm_provider = _get_llm_provider(_configured_provider_type())
+        execution.add_log(f"Provider selecionado: {llm_provider.provider_type}", "INFO", commit=False)
+    except Exception as e:
+        llm_provider = _get_llm_provider("simulation")
+        execution.add_log(f"Falha ao inicializar provider '{provider_env}', usando simulação: {e}", "WARNING", commit=False)
+    
+    run_provider = _RunProvider(llm_provider)
+    ai_system = AutonoWriteSystem(run_provider)
+    
+    # Build topic from wizard data
+    topic = _build_topic_from_wizard_data(wizard_data)
+    execution.add_log(f"Tópico construído: {topic}", "INFO", commit=False)
+    
+    # Commit inicial: o status e os primeiros logs ficam visíveis durante a
+    # geração e sobrevivem se o worker morrer. Depois dele nada vai ao banco
+    # (nem flush) até o commit final: no SQLite isso seguraria o lock de
+    # escrita durante as chamadas ao LLM. O progresso parcial é gravado à
+    # parte pelo progress_throttle, numa conexão própria.
+    db.session.commit()
+    
+    # Update progress
+    progress_throttle.record(execution_id, 0.1)
+    
+    # Generate content using multi-agent system
+    cache_key = llm_cache.cache_key(topic, 3, llm_provider)
+    result = llm_cache.get_result(cache_key)
+    if result is None:
+        execution.add_log("Iniciando pipeline multiagente", "INFO", commit=False)
+        # llm_calls vem do contador desta execução (run_provider)
+        result = ai_system.generate_content(
+            topic=topic,
+            max_iterations=3
+        )
+        llm_cache.store_result(cache_key, result)
+    else:
+        execution.add_log("Resultado reaproveitado do cache de geração", "INFO", commit=False)
+        result = {**result, 'llm_calls': 0}
+    
+    # Update progress
+    progress_throttle.record(execution_id, 0.8)
+    
+    # Process and save results
+    # Um único instante para os carimbos de data deste resultado
+    generated_at = datetime.utcnow().isoformat()
+    content_result = _process_generation_result(result, wizard_data, generated_at)
+    final_content = result.get('final_content') or ''
+    
+    # Save generated content to project
+    _persist_generation(project, content_result, generated_at)
+    
+    # Complete execution: complete() grava status, completed_at e progresso
+    # no mesmo commit do conteúdo
+    execution.final_content = final_content
+    execution.add_log("Geração de conteúdo concluída com sucesso", "INFO", commit=False)
+    execution.complete()
+    
+    return {
+        'status': 'success',
+        'execution_id': execution_id,
+        'content_length': content_result['content_length'],
+        'final_score': content_result.get('final_score', 0),
+        'iterations_used': content_result.get('iterations_used', 0)
+    }
+
+def _persist_generation(project: Project, content_result: Dict[str, Any], generated_at: str) -> None:
+    """
+    Store a generation result in the project content
+    """
+    # Um dicionário novo, montado numa passada, substitui o anterior
+    content = dict(project.content) if isinstance(project.content, dict) else {}
+    content['generated_content'] = content_result
+    content['generation_completed'] = True
+    content['generation_timestamp'] = generated_at
+    project.content = content
+    # A coluna JSON não rastreia mutações; garante o UPDATE
+    flag_modified(project, 'content')
+
+def _mark_failed(execution_id: int, error: Exception) -> None:
+    """
+    Record a generation error on the execution
+    """
+    # Descarta o que ficou pendente da transação que falhou, mas mantém os
+    # logs da execução até o erro
+    logs = log_buffer.detach()
+    db.session.rollback()
+    log_buffer.reattach(logs)
+    execution = db.session.get(Execution, execution_id)
+    if execution:
+        execution.status = ExecutionStatus.FAILED
+        execution.add_log(f"Erro na geração: {str(error)}", "ERROR")
+        db.session.commit()
+
+# Só falhas transitórias do provider (limite de taxa, timeout) são repetidas,
+# com espera exponencial e jitter para que tarefas que falharam juntas não
+# voltem todas ao mesmo tempo; erros de programa falham de vez
+@celery.task(bind=True, autoretry_for=(TransientLLMError,),
+             retry_backoff=30, retry_backoff_max=600, retry_jitter=True, max_retries=3)
 def start_content_generation(self, execution_id: int, project_id: int):
     """
     Background task to generate content using the multi-agent AI system
@@ -27,135 +243,57 @@ def start_content_generation(self, execution_id: int, project_id: int):
     
     with app.app_context():
         try:
-            # Get execution and project
-            execution = Execution.query.get(execution_id)
-            project = Project.query.get(project_id)
-            
-            if not execution or not project:
-                raise ValueError("Execution or project not found")
-            
-            # Update execution status
-            execution.status = ExecutionStatus.RUNNING
-            execution.add_log("Iniciando geração de conteúdo com sistema multiagente", "INFO")
-            db.session.commit()
-            
-            # Parse project content to get wizard data
-            if isinstance(project.content, str):
-                wizard_data = json.loads(project.content)
-            else:
-                wizard_data = project.content
-            
-            # Initialize the AI system
-            from main import LLMProvider, AutonoWriteSystem
-            
-            # Choose provider based on environment and availability
-            provider_env = os.getenv("LLM_PROVIDER", "auto").strip().lower()
-            try:
-                chosen = provider_env if provider_env in {"groq", "ollama", "simulation", "auto"} else "auto"
-                llm_provider = LLMProvider(provider_type=chosen)
-                execution.add_log(f"Provider selecionado: {llm_provider.provider_type}", "INFO")
-            except Exception as e:
-                llm_provider = LLMProvider(provider_type="simulation")
-                execution.add_log(f"Falha ao inicializar provider '{provider_env}', usando simulação: {e}", "WARNING")
-            
-            ai_system = AutonoWriteSystem(llm_provider)
-            
-            # Build topic from wizard data
-            topic = _build_topic_from_wizard_data(wizard_data)
-            execution.add_log(f"Tópico construído: {topic}", "INFO")
-            
-            # Update progress
-            execution.update_progress(0.1)
-            db.session.commit()
-            
-            # Generate content using multi-agent system
-            execution.add_log("Iniciando pipeline multiagente", "INFO")
-            result = ai_system.generate_content(
-                topic=topic,
-                max_iterations=3
-            )
-            
-            # Update progress
-            execution.update_progress(0.8)
-            db.session.commit()
-            
-            # Process and save results
-            content_result = _process_generation_result(result, wizard_data)
-            
-            # Save generated content to project
-            project.content.update({
-                'generated_content': content_result,
-                'generation_completed': True,
-                'generation_timestamp': datetime.now().isoformat()
-            })
-            
-            # Complete execution
-            execution.status = ExecutionStatus.COMPLETED
-            execution.update_progress(1.0)
-            execution.result = content_result
-            execution.add_log("Geração de conteúdo concluída com sucesso", "INFO")
-            
-            db.session.commit()
-            
-            return {
-                'status': 'success',
-                'execution_id': execution_id,
-                'content_length': len(content_result.get('final_content', '')),
-                'final_score': content_result.get('final_score', 0),
-                'iterations_used': content_result.get('iterations_used', 0)
-            }
-            
+            return _run_generation(execution_id, project_id)
         except Exception as e:
-            # Handle errors
-            with app.app_context():
-                execution = Execution.query.get(execution_id)
-                if execution:
-                    execution.status = ExecutionStatus.FAILED
-                    execution.add_log(f"Erro na geração: {str(e)}", "ERROR")
-                    db.session.commit()
-            
-            raise self.retry(exc=e, countdown=60, max_retries=3)
+            _mark_failed(execution_id, e)
+            raise
+
+def start_content_generation_sync(execution_id: int, project_id: int):
+    """
+    Synchronous version of content generation for immediate execution
+    """
+    try:
+        return _run_generation(execution_id, project_id)
+    except Exception as e:
+        try:
+            _mark_failed(execution_id, e)
+        except Exception:
+            pass
+        
+        return {'status': 'error', 'error': str(e)}
 
 def _build_topic_from_wizard_data(wizard_data: Dict[str, Any]) -> str:
     """
     Build a comprehensive topic description from wizard data
     """
-    # Extract key information
-    title = wizard_data.get('project_title', 'Projeto sem título')
-    domain = wizard_data.get('knowledge_domain', '')
-    audience = wizard_data.get('target_audience', '')
-    purpose = wizard_data.get('main_purpose', '')
-    technical_level = wizard_data.get('technical_level', '')
-    
-    # Build comprehensive topic
-    topic_parts = [title]
+    topic_parts = [wizard_data.get('project_title', 'Projeto sem título')]
     
+    domain = wizard_data.get('knowledge_domain')
     if domain:
         topic_parts.append(f"no domínio de {domain}")
     
+    audience = wizard_data.get('target_audience')
     if audience:
         topic_parts.append(f"para {audience}")
     
+    technical_level = wizard_data.get('technical_level')
     if technical_level:
-        level_map = {
-            'iniciante': 'nível iniciante',
-            'intermediario': 'nível intermediário', 
-            'avancado': 'nível avançado',
-            'academico': 'nível acadêmico'
-        }
-        topic_parts.append(f"em {level_map.get(technical_level, technical_level)}")
+        topic_parts.append(f"em {_LEVEL_MAP.get(technical_level, technical_level)}")
     
+    purpose = wizard_data.get('main_purpose')
     if purpose:
         topic_parts.append(f"com o objetivo de: {purpose}")
     
     return " ".join(topic_parts)
 
-def _process_generation_result(ai_result: Dict[str, Any], wizard_data: Dict[str, Any]) -> Dict[str, Any]:
+def _process_generation_result(ai_result: Dict[str, Any], wizard_data: Dict[str, Any],
+                               generated_at: str) -> Dict[str, Any]:
     """
     Process the AI generation result and format for storage
     """
     return {
-        'final_content': ai_result.get('final_content', ''),
+        # O texto em si fica em Execution.final_content
+        'content_length': len(ai_result.get('final_content') or ''),
         'plan': ai_result.get('plan', ''),
         'research': ai_result.get('research', ''),
         'final_score': ai_result.get('final_score', 0),
@@ -173,119 +311,12 @@ def _process_generation_result(ai_result: Dict[str, Any], wizard_data: Dict[str,
             'output_format': wizard_data.get('output_format', 'markdown')
         },
         'metadata': {
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': generated_at,
             'system_version': '1.0',
             'agent_system': 'AutonoWrite MultiAgent'
         }
     }
 
-def start_content_generation_sync(execution_id: int, project_id: int):
-    """
-    Synchronous version of content generation for immediate execution
-    """
-    try:
-        # Get execution and project
-        from app import db
-        from app.models.project import Project
-        from app.models.execution import Execution, ExecutionStatus
-        
-        execution = Execution.query.get(execution_id)
-        project = Project.query.get(project_id)
-        
-        if not execution or not project:
-            return {'status': 'error', 'error': 'Execution or project not found'}
-        
-        # Update execution status
-        execution.status = ExecutionStatus.RUNNING
-        execution.add_log("Iniciando geração de conteúdo com sistema multiagente", "INFO")
-        db.session.commit()
-        
-        # Parse project content to get wizard data
-        if isinstance(project.content, str):
-            wizard_data = json.loads(project.content)
-        else:
-            wizard_data = project.content
-        
-        # Initialize the AI system
-        from main import LLMProvider, AutonoWriteSystem
-        
-        # Choose provider based on environment and availability
-        provider_env = os.getenv("LLM_PROVIDER", "auto").strip().lower()
-        try:
-            chosen = provider_env if provider_env in {"groq", "ollama", "simulation", "auto"} else "auto"
-            llm_provider = LLMProvider(provider_type=chosen)
-            execution.add_log(f"Provider selecionado: {llm_provider.provider_type}", "INFO")
-        except Exception as e:
-            llm_provider = LLMProvider(provider_type="simulation")
-            execution.add_log(f"Falha ao inicializar provider '{provider_env}', usando simulação: {e}", "WARNING")
-        
-        ai_system = AutonoWriteSystem(llm_provider)
-        
-        # Build topic from wizard data
-        topic = _build_topic_from_wizard_data(wizard_data)
-        execution.add_log(f"Tópico construído: {topic}", "INFO")
-        
-        # Update progress
-        execution.update_progress(0.1)
-        db.session.commit()
-        
-        # Generate content using multi-agent system
-        execution.add_log("Iniciando pipeline multiagente", "INFO")
-        result = ai_system.generate_content(
-            topic=topic,
-            max_iterations=3
-        )
-        
-        # Update progress
-        execution.update_progress(0.8)
-        db.session.commit()
-        
-        # Process and save results
-        content_result = _process_generation_result(result, wizard_data)
-        
-        # Save generated content to project
-        if not isinstance(project.content, dict):
-            project.content = {}
-        
-        project.content.update({
-            'generated_content': content_result,
-            'generation_completed': True,
-            'generation_timestamp': datetime.now().isoformat()
-        })
-        
-        # Mark the project content as modified for SQLAlchemy
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(project, 'content')
-        
-        # Complete execution
-        execution.status = ExecutionStatus.COMPLETED
-        execution.update_progress(1.0)
-        execution.result = content_result
-        execution.add_log("Geração de conteúdo concluída com sucesso", "INFO")
-        
-        db.session.commit()
-        
-        return {
-            'status': 'success',
-            'execution_id': execution_id,
-            'content_length': len(content_result.get('final_content', '')),
-            'final_score': content_result.get('final_score', 0),
-            'iterations_used': content_result.get('iterations_used', 0)
-        }
-        
-    except Exception as e:
-        # Handle errors
-        try:
-            execution = Execution.query.get(execution_id)
-            if execution:
-                execution.status = ExecutionStatus.FAILED
-                execution.add_log(f"Erro na geração: {str(e)}", "ERROR")
-                db.session.commit()
-        except:
-            pass
-        
-        return {'status': 'error', 'error': str(e)}
-
 @celery.task
 def cleanup_old_executions():
     """
@@ -0,0 +1,56 @@
+"""
+Cache of multi-agent generation results
+
+A result is stored in the Flask-Caching backend under a SHA-256 of
+everything that shapes it (topic, iteration limit, provider, model and the
+agents' prompt templates), so a repeated generation with the same inputs
+skips the LLM calls. Disabled unless LLM_CACHE_TIMEOUT is set.
+"""
+import functools
+import hashlib
+
+import orjson
+from flask import current_app
+
+from app import cache
+
+def _timeout() -> int:
+    return current_app.config.get('LLM_CACHE_TIMEOUT', 0)
+
+@functools.lru_cache(maxsize=None)
+def _prompts_digest() -> str:
+    """
+    SHA-256 of every agent's prompt template, so editing a prompt invalidates old results
+    """
+    from main import Agent, AgentRole
+    templates = [Agent(role, None)._build_prompt('{task}', '{context}') for role in AgentRole]
+    return hashlib.sha256(orjson.dumps(templates)).hexdigest()
+
+def cache_key(topic: str, max_iterations: int, llm_provider) -> str:
+    """
+    Key for a generation of topic with the given provider
+    """
+    payload = orjson.dumps({
+        'topic': topic,
+        'max_iterations': max_iterations,
+        'provider': llm_provider.provider_type,
+        'model': getattr(llm_provider, 'model_name', None),
+        'prompts': _prompts_digest(),
+    }, option=orjson.OPT_SORT_KEYS)
+    return 'llm_result:' + hashlib.sha256(payload).hexdigest()
+
+def get_result(key: str):
+    """
+    Cached generation result for key, or None
+    """
+    if not _timeout():
+        return None
+    return cache.get(key)
+
+def store_result(key: str, result) -> None:
+    """
+    Cache a generation result under key
+    """
+    timeout = _timeout()
+    if timeout:
+        cache.set(key, result, timeout=timeout)
@@ -1,5 +1,32 @@
+import re
 from datetime import datetime
 
+from flask import g, has_request_context
+
+_TAG_RE = re.compile(r'<[^<]+?>')
+_WS_RE = re.compile(r'\n\s*\n')
+
+# Acima deste tamanho o HTML é convertido pelo parser em C do selectolax,
+# quando instalado
+_LARGE_HTML = 100 * 1024
+
+_PERIODS = (
+    ('year', 'years', 60*60*24*365),
+    ('month', 'months', 60*60*24*30),
+    ('day', 'days', 60*60*24),
+    ('hour', 'hours', 60*60),
+    ('minute', 'minutes', 60),
+    ('second', 'seconds', 1)
+)
+
+def _now():
+    """utcnow taken once per request, so a long list renders with one clock read"""
+    if not has_request_context():
+        return datetime.utcnow()
+    if '_timesince_now' not in g:
+        g._timesince_now = datetime.utcnow()
+    return g._timesince_now
+
 def timesince(dt, default="just now"):
     """
     Returns string representing "time since" e.g.
@@ -8,24 +35,33 @@ def timesince(dt, default="just now"):
     if dt is None:
         return ""
         
-    now = datetime.utcnow()
-    diff = now - dt
-    
-    periods = [
-        ('year', 'years', 60*60*24*365),
-        ('month', 'months', 60*60*24*30),
-        ('day', 'days', 60*60*24),
-        ('hour', 'hours', 60*60),
-        ('minute', 'minutes', 60),
-        ('second', 'seconds', 1)
-    ]
+    total = int((_now() - dt).total_seconds())
     
-    for period, plural_period, seconds in periods:
-        value = diff.total_seconds() / seconds
+    for period, plural_period, seconds in _PERIODS:
+        value = total // seconds
         if value >= 1:
-            value = int(round(value))
             if value == 1:
                 return f"{value} {period} ago"
             else:
                 return f"{value} {plural_period} ago"
     return default
+
+
+def strip_html(html):
+    """
+    Returns generated HTML content as plain text, collapsing
+    runs of blank lines.
+    """
+    if not html:
+        return ""
+    text = None
+    if len(html) > _LARGE_HTML:
+        try:
+            from selectolax.parser import HTMLParser
+        except ImportError:
+            pass
+        else:
+            text = HTMLParser(html).text(separator='')
+    if text is None:
+        text = _TAG_RE.sub('', html)
+    return _WS_RE.sub('\n\n', text)
@@ -1,37 +1,73 @@
-from functools import wraps
-from flask import jsonify, request, abort
+from functools import partial, wraps
+from flask import g, jsonify, request, abort
 from flask_login import current_user
+from werkzeug.exceptions import BadRequest
+from sqlalchemy.orm import defer
+from app import db
 from app.models.project import Project
 from app.models.execution import Execution
 
+def _is_admin():
+    """Whether the current user is an admin, evaluated once per request"""
+    if '_is_admin' not in g:
+        g._is_admin = bool(current_user.is_admin)
+    return g._is_admin
+
+def get_owned_project(project_id, defer_content=False):
+    """Load a project the current user can access, or abort with 404
+
+    Ownership is part of the query, so other users' projects are never
+    loaded; admins can access any project. With ``defer_content`` the large
+    ``content`` JSON column is only fetched if it is actually used. The
+    result is memoized for the rest of the request.
+    """
+    owned = g.setdefault('_owned_projects', {})
+    if project_id not in owned:
+        query = Project.query.filter_by(id=project_id)
+        if not _is_admin():
+            query = query.filter_by(user_id=current_user.id)
+        if defer_content:
+            query = query.options(defer(Project.content))
+        owned[project_id] = query.first_or_404()
+    return owned[project_id]
+
 def project_required(f):
     """Decorator to ensure the project exists and user has access"""
     @wraps(f)
     def decorated_function(project_id, *args, **kwargs):
-        project = Project.query.get_or_404(project_id)
-        
-        # Check if user has access to the project
-        if project.user_id != current_user.id and not current_user.is_admin:
-            abort(403)  # Forbidden
-            
+        project = get_owned_project(project_id)
         return f(project=project, *args, **kwargs)
     return decorated_function
 
-def execution_required(f):
-    """Decorator to ensure the execution exists and user has access"""
+def execution_required(f=None, *, options=()):
+    """Decorator to ensure the execution exists and user has access
+
+    Can be given loader ``options`` to apply when loading the execution,
+    e.g. ``@execution_required(options=(joinedload(Execution.project),))``.
+    """
+    if f is None:
+        return partial(execution_required, options=options)
+    
     @wraps(f)
     def decorated_function(execution_id, *args, **kwargs):
-        execution = Execution.query.get_or_404(execution_id)
+        # session.get consulta o identity map antes de emitir SQL
+        execution = db.session.get(Execution, execution_id, options=options)
+        if execution is None:
+            abort(404)
         
         # Check if user has access to the execution
-        if execution.user_id != current_user.id and not current_user.is_admin:
+        if execution.user_id != current_user.id and not _is_admin():
             abort(403)  # Forbidden
             
         return f(execution=execution, *args, **kwargs)
     return decorated_function
 
 def json_required(f):
-    """Decorator to ensure the request has valid JSON"""
+    """Decorator to ensure the request has valid JSON
+
+    The parsed body, which may be None for a JSON ``null``, is left on
+    ``g.json_body`` for the view.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if not request.is_json:
@@ -39,10 +75,12 @@ def json_required(f):
                 'status': 'error',
                 'message': 'Content-Type must be application/json'
             }), 400
-            
+        
+        # Só o JSON malformado é recusado; um corpo `null` válido chega à
+        # view como None. O resultado fica em cache no request
         try:
-            request.get_json()
-        except Exception:
+            g.json_body = request.get_json()
+        except BadRequest:
             return jsonify({
                 'status': 'error',
                 'message': 'Invalid JSON data'
@@ -55,7 +93,7 @@ def admin_required(f):
     """Decorator to ensure the user is an admin"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_admin:
+        if not current_user.is_authenticated or not _is_admin():
             abort(403)  # Forbidden
         return f(*args, **kwargs)
     return decorated_function
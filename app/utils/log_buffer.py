@@ -0,0 +1,59 @@
+"""Batched writes of ExecutionLog rows
+
+Log entries are buffered on the current database session and written with a
+single bulk insert right before that session commits, instead of one INSERT
+and one COMMIT per entry. A rollback discards them together with the rest of
+the transaction.
+"""
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import db
+
+_INFO_KEY = 'execution_log_buffer'
+
+
+def enqueue(execution_id, message, level):
+    """Buffer a log row on the current session, written by its next commit"""
+    db.session().info.setdefault(_INFO_KEY, []).append({
+        'execution_id': execution_id,
+        'message': message,
+        'level': level,
+        'timestamp': datetime.utcnow(),
+    })
+
+
+def detach():
+    """Remove and return the rows buffered on the current session"""
+    return db.session().info.pop(_INFO_KEY, [])
+
+
+def reattach(rows):
+    """Buffer rows previously returned by ``detach()`` again"""
+    if rows:
+        db.session().info.setdefault(_INFO_KEY, []).extend(rows)
+
+
+def flush(session=None):
+    """Write the rows buffered on a session with one bulk insert, without committing"""
+    session = session if session is not None else db.session()
+    rows = session.info.pop(_INFO_KEY, None)
+    if not rows:
+        return 0
+
+    from app.models.execution import ExecutionLog
+    session.bulk_insert_mappings(ExecutionLog, rows)
+    return len(rows)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _flush_before_commit(session):
+    flush(session)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    # Logs da transação desfeita não podem sair no próximo commit
+    if not previous_transaction.nested:
+        session.info.pop(_INFO_KEY, None)
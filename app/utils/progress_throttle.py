@@ -0,0 +1,62 @@
+"""Throttled writes of Execution.progress
+
+Progress is written straight to the database, so the web process sees what
+Celery workers report, but at most once every MIN_INTERVAL seconds per
+execution. Values reported in between are dropped; the final value (1.0)
+is always written.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+
+# Intervalo mínimo, em segundos, entre duas gravações da mesma execução
+MIN_INTERVAL = 0.5
+# Quantas execuções o throttle lembra; as mais antigas são esquecidas
+MAX_TRACKED = 1024
+
+_last_write = OrderedDict()
+_lock = threading.Lock()
+
+
+def record(execution_id, progress):
+    """Write the progress of an execution unless it was written too recently
+
+    Returns True when the value reached the database.
+    """
+    now = time.monotonic()
+    with _lock:
+        last = _last_write.get(execution_id)
+        if progress < 1.0 and last is not None and now - last < MIN_INTERVAL:
+            return False
+        if progress >= 1.0:
+            _last_write.pop(execution_id, None)
+        else:
+            _last_write[execution_id] = now
+            _last_write.move_to_end(execution_id)
+            while len(_last_write) > MAX_TRACKED:
+                _last_write.popitem(last=False)
+
+    try:
+        _write(execution_id, progress)
+    except SQLAlchemyError:
+        current_app.logger.exception('Error writing execution progress')
+        return False
+    return True
+
+
+def _write(execution_id, progress):
+    from app.models.execution import Execution, CANCELLABLE_STATUSES
+    executions = Execution.__table__
+    # Conexão própria: não faz commit da transação em andamento na sessão.
+    # Execuções já finalizadas não são tocadas: complete()/fail() têm a palavra final
+    with db.engine.begin() as conn:
+        conn.execute(update(executions).where(
+            executions.c.id == execution_id,
+            executions.c.status.in_(CANCELLABLE_STATUSES)
+        ).values(progress=progress))
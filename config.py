@@ -12,9 +12,17 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Opções do engine: o create_app escolhe as de SQLite ou as do pool de
+    # um banco servidor (DB_POOL_SIZE, DB_MAX_OVERFLOW)
     
-    # Session
-    SESSION_TYPE = 'filesystem'
+    # Session: cookie assinado padrão do Flask, sem armazenamento no servidor
+    
+    # Cache
+    CACHE_TYPE = 'SimpleCache'
+    CACHE_DEFAULT_TIMEOUT = 120
+    
+    # Segundos que um resultado de geração fica no cache (0 desativa)
+    LLM_CACHE_TIMEOUT = int(os.environ.get('LLM_CACHE_TIMEOUT', 0))
     
     # File uploads
     UPLOAD_FOLDER = os.path.join(basedir, 'app/static/uploads')
@@ -15,8 +15,15 @@ class DevelopmentConfig:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # Session
-    SESSION_TYPE = 'filesystem'
+    # Session: cookie assinado padrão do Flask, sem armazenamento no servidor
+    
+    # Cache
+    CACHE_TYPE = 'SimpleCache'
+    CACHE_DEFAULT_TIMEOUT = 120
+    
+    # Segundos que um resultado de geração fica no cache; desligado por
+    # padrão para que "executar de novo" gere um texto novo
+    LLM_CACHE_TIMEOUT = int(os.environ.get('LLM_CACHE_TIMEOUT', 0))
     
     # File uploads
     UPLOAD_FOLDER = os.path.join(basedir, 'app/static/uploads')
@@ -1,4 +1,5 @@
 import psycopg2
+from psycopg2 import sql
 from config import Config
 
 def drop_database():
@@ -22,16 +23,9 @@ def drop_database():
     # Drop the database
     db_name = url.database
     with conn.cursor() as cur:
-        # Terminate all connections to the database
-        cur.execute("""
-            SELECT pg_terminate_backend(pg_stat_activity.pid)
-            FROM pg_stat_activity
-            WHERE pg_stat_activity.datname = %s
-            AND pid <> pg_backend_pid();
-        """, (db_name,))
-        
-        # Drop the database with CASCADE
-        cur.execute(f'DROP DATABASE IF EXISTS \"{db_name}\" WITH (FORCE)')
+        # WITH (FORCE) already terminates the other connections to the
+        # database, so the drop is a single round trip
+        cur.execute(sql.SQL('DROP DATABASE IF EXISTS {} WITH (FORCE)').format(sql.Identifier(db_name)))
     
     conn.close()
     print(f"Dropped database: {db_name}")
@@ -1,6 +1,23 @@
 import os
+from sqlalchemy import create_engine, event
 from app import create_app, db
-from app.models import User, Project, Execution, ExecutionLog, ExecutionStatus, ExecutionLogLevel
+from app.models import User, Project
+from app.security import hash_password
+
+def _transactional_engine(url, options):
+    """Engine whose transactions also cover DDL on SQLite"""
+    engine = create_engine(url, **options)
+    if engine.dialect.name == 'sqlite':
+        # pysqlite only opens a transaction before INSERT/UPDATE/DELETE, so
+        # CREATE/DROP would run in autocommit; emit BEGIN ourselves instead
+        @event.listens_for(engine, 'connect')
+        def _disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+        
+        @event.listens_for(engine, 'begin')
+        def _emit_begin(conn):
+            conn.exec_driver_sql('BEGIN')
+    return engine
 
 def init_db():
     # Ensure we're using SQLite for this initialization
@@ -8,45 +25,35 @@ def init_db():
     
     app = create_app()
     with app.app_context():
-        # Disable foreign key constraints for SQLite
-        if 'sqlite' in str(db.engine.url):
-            db.engine.execute('PRAGMA foreign_keys=OFF')
-        
-        # Drop all tables
-        db.drop_all()
-        
-        # Re-enable foreign key constraints
-        if 'sqlite' in str(db.engine.url):
-            db.engine.execute('PRAGMA foreign_keys=ON')
-        
-        # Create all tables
-        db.create_all()
-        
-        # Create admin user
-        admin = User(
-            username='admin',
-            email='admin@example.com',
-            is_admin=True
-        )
-        admin.set_password('admin123')
-        db.session.add(admin)
-        
-        # Create a sample project
-        project = Project(
-            title='Sample Project',
-            description='This is a sample project',
-            user_id=1,
-            status='draft'
-        )
-        db.session.add(project)
-        
-        # Commit the changes
-        db.session.commit()
+        # One transaction for the whole reset: DDL and seed rows
+        engine = _transactional_engine(db.engine.url, app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+        with engine.begin() as conn:
+            # Este engine não recebe os PRAGMAs do create_app; drop_all
+            # remove as tabelas na ordem das dependências de qualquer forma
+            db.metadata.drop_all(bind=conn)
+            db.metadata.create_all(bind=conn)
+            
+            # Create admin user
+            admin_id = conn.execute(User.__table__.insert().values(
+                username='admin',
+                email='admin@example.com',
+                password_hash=hash_password('admin123'),
+                is_admin=True
+            )).inserted_primary_key[0]
+            
+            # Create a sample project
+            project_id = conn.execute(Project.__table__.insert().values(
+                title='Sample Project',
+                description='This is a sample project',
+                user_id=admin_id,
+                status='draft'
+            )).inserted_primary_key[0]
+        engine.dispose()
         
         print("\nDatabase initialized successfully!")
         print("SQLite database file created at:", os.path.abspath('app.db'))
         print("Admin user created with username: admin, password: admin123")
-        print("Sample project created with ID: 1\n")
+        print(f"Sample project created with ID: {project_id}\n")
 
 if __name__ == '__main__':
     init_db()
@@ -4,10 +4,12 @@ from config_development import config
 from app.models import User, Project, Execution, ExecutionLog, ExecutionStatus, ExecutionLogLevel
 
 def init_database():
-    # Remove existing SQLite database if it exists
+    # Remove existing SQLite database if it exists, along with the WAL and
+    # shared-memory files left by the connections' journal_mode=WAL
     db_path = 'app.db'
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
     
     # Create app with development config
     app = create_app(config)
@@ -7,6 +7,7 @@ Versão integrada para TCC com recursos gratuitos
 import os
 import json
 import time
+import threading
 from typing import Dict, List, Optional
 from datetime import datetime
 from dataclasses import dataclass
@@ -33,11 +34,30 @@ except ImportError:
     DOTENV_AVAILABLE = False
 
 
+class TransientLLMError(Exception):
+    """Limite de taxa ou timeout do provider: vale tentar de novo mais tarde"""
+
+
+def _is_transient(error: Exception) -> bool:
+    """Indica se o erro do provider é um limite de taxa (429) ou timeout"""
+    if isinstance(error, TimeoutError) or getattr(error, 'status_code', None) == 429:
+        return True
+    # groq.RateLimitError/APITimeoutError, httpx.TimeoutException e afins
+    return any(cls.__name__ in ('RateLimitError', 'APITimeoutError', 'TimeoutException')
+               for cls in type(error).__mro__)
+
+
 class LLMProvider:
     """Provider base para diferentes modelos LLM"""
     
+    # Limita as chamadas simultâneas ao LLM quando várias gerações rodam em
+    # threads do mesmo processo (LLM_CONCURRENCY, padrão 4)
+    _call_slots = threading.BoundedSemaphore(int(os.getenv("LLM_CONCURRENCY", "4")))
+    
     def __init__(self, provider_type: str = "simulation"):
         self.call_count = 0
+        # O mesmo provider pode ser usado por várias threads
+        self._count_lock = threading.Lock()
         self.provider_type = provider_type
         self.client = None
         
@@ -127,14 +147,16 @@ class LLMProvider:
     
     def generate(self, prompt: str, max_tokens: int = 1500) -> str:
         """Gera resposta usando o provider configurado"""
-        self.call_count += 1
+        with self._count_lock:
+            self.call_count += 1
         
-        if self.provider_type == "groq":
-            return self._generate_groq(prompt, max_tokens)
-        elif self.provider_type == "ollama":
-            return self._generate_ollama(prompt, max_tokens)
-        else:
-            return self._generate_simulation(prompt)
+        with self._call_slots:
+            if self.provider_type == "groq":
+                return self._generate_groq(prompt, max_tokens)
+            elif self.provider_type == "ollama":
+                return self._generate_ollama(prompt, max_tokens)
+            else:
+                return self._generate_simulation(prompt)
     
     def _generate_groq(self, prompt: str, max_tokens: int) -> str:
         """Geração via Groq"""
@@ -147,6 +169,8 @@ class LLMProvider:
             )
             return completion.choices[0].message.content
         except Exception as e:
+            if _is_transient(e):
+                raise TransientLLMError(str(e)) from e
             return f"Erro Groq: {str(e)}"
     
     def _generate_ollama(self, prompt: str, max_tokens: int) -> str:
@@ -158,6 +182,8 @@ class LLMProvider:
             )
             return response['message']['content']
         except Exception as e:
+            if _is_transient(e):
+                raise TransientLLMError(str(e)) from e
             return f"Erro Ollama: {str(e)}"
     
     def _simulate_llm_response(self, prompt: str, max_tokens: int) -> str:
@@ -0,0 +1,31 @@
+"""execution lookup indexes
+
+Revision ID: 8e4b2d7f1a6c
+Revises: 5c1f0a3b9d2e
+Create Date: 2026-10-16 11:04:27.590113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2d7f1a6c'
+down_revision = '5c1f0a3b9d2e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exec_project_started', 'executions',
+                    ['project_id', sa.text('started_at DESC')], if_not_exists=True)
+    op.create_index('ix_exec_project_status', 'executions',
+                    ['project_id', 'status'], if_not_exists=True)
+    op.create_index('ix_log_exec_id', 'execution_logs',
+                    ['execution_id', 'id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_log_exec_id', table_name='execution_logs', if_exists=True)
+    op.drop_index('ix_exec_project_status', table_name='executions', if_exists=True)
+    op.drop_index('ix_exec_project_started', table_name='executions', if_exists=True)
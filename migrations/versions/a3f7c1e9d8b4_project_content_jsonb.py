@@ -0,0 +1,36 @@
+"""store project content as JSONB on PostgreSQL
+
+Revision ID: a3f7c1e9d8b4
+Revises: f1b9d4c7a2e8
+Create Date: 2026-10-16 16:48:30.215776
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f7c1e9d8b4'
+down_revision = 'f1b9d4c7a2e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite has a single JSON storage; only PostgreSQL changes type
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('projects', 'content',
+                    existing_type=sa.JSON(),
+                    type_=postgresql.JSONB(),
+                    postgresql_using='content::jsonb')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('projects', 'content',
+                    existing_type=postgresql.JSONB(),
+                    type_=sa.JSON(),
+                    postgresql_using='content::json')
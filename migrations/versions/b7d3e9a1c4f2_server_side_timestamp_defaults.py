@@ -0,0 +1,43 @@
+"""server-side timestamp defaults
+
+Revision ID: b7d3e9a1c4f2
+Revises: 8e4b2d7f1a6c
+Create Date: 2026-10-16 13:37:52.104862
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e9a1c4f2'
+down_revision = '8e4b2d7f1a6c'
+branch_labels = None
+depends_on = None
+
+# (table, column, nullable) of the timestamps now filled in by the database
+TIMESTAMP_COLUMNS = (
+    ('projects', 'created_at', True),
+    ('projects', 'updated_at', True),
+    ('executions', 'started_at', True),
+    ('execution_logs', 'timestamp', False),
+)
+
+
+def _set_defaults(server_default):
+    for table in ('projects', 'executions', 'execution_logs'):
+        with op.batch_alter_table(table) as batch_op:
+            for table_name, column, nullable in TIMESTAMP_COLUMNS:
+                if table_name == table:
+                    batch_op.alter_column(column,
+                                          existing_type=sa.DateTime(),
+                                          existing_nullable=nullable,
+                                          server_default=server_default)
+
+
+def upgrade():
+    _set_defaults(sa.text('CURRENT_TIMESTAMP'))
+
+
+def downgrade():
+    _set_defaults(None)
@@ -0,0 +1,26 @@
+"""index for the latest completed execution of a project
+
+Revision ID: b8e2f6a4c9d1
+Revises: a3f7c1e9d8b4
+Create Date: 2026-10-16 17:20:03.471892
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2f6a4c9d1'
+down_revision = 'a3f7c1e9d8b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exec_project_status_completed', 'executions',
+                    ['project_id', 'status', sa.text('completed_at DESC')],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_exec_project_status_completed', table_name='executions', if_exists=True)
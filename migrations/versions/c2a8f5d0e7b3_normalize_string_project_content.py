@@ -0,0 +1,38 @@
+"""normalize project content stored as a JSON string
+
+Revision ID: c2a8f5d0e7b3
+Revises: b7d3e9a1c4f2
+Create Date: 2026-10-16 14:21:09.736415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a8f5d0e7b3'
+down_revision = 'b7d3e9a1c4f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older rows hold the wizard data double-encoded (a JSON string whose
+    # text is the actual document); unwrap them so content is always an object
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "UPDATE projects SET content = json_extract(content, '$') "
+            "WHERE json_valid(content) AND json_type(content) = 'text' "
+            "AND json_valid(json_extract(content, '$'))"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "UPDATE projects SET content = (content #>> '{}')::json "
+            "WHERE json_typeof(content) = 'string'"
+        )
+
+
+def downgrade():
+    # The unwrapped documents are equivalent; there is nothing to restore
+    pass
@@ -0,0 +1,25 @@
+"""final_content column on executions
+
+Revision ID: c5d2a7e9f0b3
+Revises: b8e2f6a4c9d1
+Create Date: 2026-10-16 18:41:27.903514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d2a7e9f0b3'
+down_revision = 'b8e2f6a4c9d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('executions', sa.Column('final_content', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('executions') as batch_op:
+        batch_op.drop_column('final_content')
@@ -0,0 +1,36 @@
+"""lower() expression indexes for project search
+
+Revision ID: d4e1b6a9f3c7
+Revises: c2a8f5d0e7b3
+Create Date: 2026-10-16 15:02:44.318920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e1b6a9f3c7'
+down_revision = 'c2a8f5d0e7b3'
+branch_labels = None
+depends_on = None
+
+
+def _lower(column):
+    # text_pattern_ops lets PostgreSQL answer LIKE 'prefix%' from the index
+    # regardless of the database collation
+    if op.get_bind().dialect.name == 'postgresql':
+        return sa.text(f'lower({column}) text_pattern_ops')
+    return sa.text(f'lower({column})')
+
+
+def upgrade():
+    op.create_index('ix_project_title_lower', 'projects',
+                    [_lower('title')], if_not_exists=True)
+    op.create_index('ix_project_description_lower', 'projects',
+                    [_lower('description')], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_project_description_lower', table_name='projects', if_exists=True)
+    op.drop_index('ix_project_title_lower', table_name='projects', if_exists=True)
@@ -0,0 +1,54 @@
+"""back to Python-side timestamp defaults
+
+The CURRENT_TIMESTAMP defaults from b7d3e9a1c4f2 store whole-second text on
+SQLite ('YYYY-MM-DD HH:MM:SS') while values written by the application carry
+microseconds, so one column mixed two formats and text comparisons (keyset
+cursors, ORDER BY) went wrong. The models stamp these columns in Python
+again; this drops the server defaults and pads the whole-second values.
+
+Revision ID: d9a4e2c7b1f6
+Revises: c5d2a7e9f0b3
+Create Date: 2026-10-17 09:12:40.518337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4e2c7b1f6'
+down_revision = 'c5d2a7e9f0b3'
+branch_labels = None
+depends_on = None
+
+# (table, column, nullable) of the timestamps stamped by the models
+TIMESTAMP_COLUMNS = (
+    ('projects', 'created_at', True),
+    ('projects', 'updated_at', True),
+    ('executions', 'started_at', True),
+    ('execution_logs', 'timestamp', False),
+)
+
+
+def _set_defaults(server_default):
+    for table in ('projects', 'executions', 'execution_logs'):
+        with op.batch_alter_table(table) as batch_op:
+            for table_name, column, nullable in TIMESTAMP_COLUMNS:
+                if table_name == table:
+                    batch_op.alter_column(column,
+                                          existing_type=sa.DateTime(),
+                                          existing_nullable=nullable,
+                                          server_default=server_default)
+
+
+def upgrade():
+    _set_defaults(None)
+    if op.get_bind().dialect.name == 'sqlite':
+        # Mesmo formato que o SQLAlchemy grava: 'YYYY-MM-DD HH:MM:SS.ffffff'
+        for table, column, _ in TIMESTAMP_COLUMNS:
+            op.execute(f"UPDATE {table} SET {column} = {column} || '.000000' "
+                       f"WHERE length({column}) = 19")
+
+
+def downgrade():
+    _set_defaults(sa.text('CURRENT_TIMESTAMP'))
@@ -0,0 +1,26 @@
+"""project list keyset index
+
+Revision ID: e6c3a8d2b5f1
+Revises: d4e1b6a9f3c7
+Create Date: 2026-10-16 15:27:51.604137
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c3a8d2b5f1'
+down_revision = 'd4e1b6a9f3c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_project_user_updated', 'projects',
+                    ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_project_user_updated', table_name='projects', if_exists=True)
@@ -0,0 +1,52 @@
+"""cascade project and execution deletes in the database
+
+Revision ID: f1b9d4c7a2e8
+Revises: e6c3a8d2b5f1
+Create Date: 2026-10-16 16:05:12.887341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b9d4c7a2e8'
+down_revision = 'e6c3a8d2b5f1'
+branch_labels = None
+depends_on = None
+
+# The initial schema created these foreign keys without names; on SQLite the
+# batch reflection names them through this convention so they can be dropped
+NAMING_CONVENTION = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s',
+}
+
+# (table, column, referred table)
+CASCADE_FOREIGN_KEYS = (
+    ('executions', 'project_id', 'projects'),
+    ('execution_logs', 'execution_id', 'executions'),
+)
+
+
+def _fk_name(table, column, referred_table):
+    if op.get_bind().dialect.name == 'postgresql':
+        # Name PostgreSQL generated for the unnamed constraint
+        return f'{table}_{column}_fkey'
+    return f'fk_{table}_{column}_{referred_table}'
+
+
+def _recreate_foreign_keys(ondelete):
+    for table, column, referred_table in CASCADE_FOREIGN_KEYS:
+        name = _fk_name(table, column, referred_table)
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred_table, [column], ['id'],
+                                        ondelete=ondelete)
+
+
+def upgrade():
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _recreate_foreign_keys(None)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """Main entry point for the AutonoWrite application."""
 import os
-from app import create_app
+import sys
+from sqlalchemy import inspect
+from app import create_app, db
 from config_development import config
 
 # Force SQLite database for consistency
@@ -9,5 +11,14 @@ os.environ['DATABASE_URL'] = 'sqlite:///app.db'
 
 app = create_app(config)
 
+def _check_database():
+    """Stop with a hint when the tables have not been created yet"""
+    # create_app no longer creates tables; fail here rather than on the first query
+    with app.app_context():
+        if not inspect(db.engine).has_table('users'):
+            sys.exit("Database not initialized. Run `flask --app run init-db` "
+                     "(or `flask --app run db upgrade`) first.")
+
 if __name__ == '__main__':
+    _check_database()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -5,6 +5,7 @@ Test script for the execution system using SQLite directly
 import os
 import sys
 import json
+from urllib.parse import urlencode
 from datetime import datetime
 
 # Add the project root to the path
@@ -13,19 +14,458 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from app import create_app, db
 from app.models.project import Project
 from app.models.user import User
-from app.models.execution import Execution, ExecutionStatus
+from app.models.execution import Execution, ExecutionLog, ExecutionStatus
 
-def test_execution_system():
-    """Test the execution system with a sample project"""
+def _sqlite_config(db_path):
+    """Testing config bound to a SQLite file, with the wizard store next to it"""
+    uri = f'sqlite:///{db_path}'
+    os.environ['DATABASE_URL'] = uri
+    
+    from config import TestingConfig
+    
+    class _Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        WIZARD_CACHE_DIR = str(db_path) + '.wizard'
+    return _Config
+
+def _make_sqlite_app(db_path):
+    """App bound to a fresh SQLite file with one user and one project"""
+    app = create_app(_sqlite_config(db_path))
+    with app.app_context():
+        db.create_all()
+        user = User(username='tester', email='tester@example.com')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Project(title='Buffered logs', user_id=user.id, content={}))
+        db.session.commit()
+    return app
+
+def _new_execution(project):
+    execution = Execution(project_id=project.id, user_id=project.user_id)
+    db.session.add(execution)
+    db.session.commit()
+    return execution
+
+def test_add_log_commit_persists(tmp_path):
+    """add_log(commit=True) writes the entry before returning"""
+    app = _make_sqlite_app(tmp_path / 'logs.db')
+    with app.app_context():
+        execution = _new_execution(Project.query.first())
+        execution.add_log("first entry")
+        execution_id = execution.id
+        db.session.remove()
+        
+        assert [row.message for row in db.session.get(Execution, execution_id).log_rows()] == ["first entry"]
+
+def test_rollback_discards_buffered_logs(tmp_path):
+    """Logs buffered in a rolled back transaction are not written by the next commit"""
+    app = _make_sqlite_app(tmp_path / 'logs.db')
+    with app.app_context():
+        execution = _new_execution(Project.query.first())
+        execution.add_log("lost with the rollback", commit=False)
+        db.session.rollback()
+        
+        execution.add_log("kept", commit=False)
+        db.session.commit()
+        
+        assert [row.message for row in execution.log_rows()] == ["kept"]
+
+def test_set_metadata_sqlite(tmp_path):
+    """set_metadata patches one key in the database and keeps the others"""
+    from sqlalchemy import null, update
+    
+    app = _make_sqlite_app(tmp_path / 'metadata.db')
+    with app.app_context():
+        project = Project.query.first()
+        execution = Execution(project_id=project.id, user_id=project.user_id,
+                              metadata_={'test': True})
+        db.session.add(execution)
+        db.session.commit()
+        execution_id = execution.id
+        
+        execution.set_metadata('result', {'score': 8.5, 'tags': ['a', 'b']})
+        execution.set_metadata('generation_completed', True)
+        assert execution.metadata_['generation_completed'] is True
+        db.session.commit()
+        db.session.remove()
+        
+        assert db.session.get(Execution, execution_id).metadata_ == {
+            'test': True,
+            'result': {'score': 8.5, 'tags': ['a', 'b']},
+            'generation_completed': True,
+        }
+        
+        # Metadados NULL no banco também recebem a chave
+        db.session.execute(update(Execution).where(Execution.id == execution_id)
+                           .values(metadata_=null()))
+        db.session.commit()
+        execution = db.session.get(Execution, execution_id)
+        execution.set_metadata('retry', 1)
+        db.session.commit()
+        db.session.remove()
+        assert db.session.get(Execution, execution_id).metadata_ == {'retry': 1}
+
+def test_active_execution_not_hidden_by_newer_rows(tmp_path):
+    """A newer PENDING/FAILED execution does not hide one that is still running"""
+    app = _make_sqlite_app(tmp_path / 'active.db')
+    with app.app_context():
+        project = Project.query.first()
+        running = project.create_execution(project.user_id, start=True)
+        assert project.get_active_execution() is running
+        
+        newer = project.create_execution(project.user_id)
+        assert project.get_last_execution() is newer
+        assert project.get_active_execution() is running
+        
+        newer.status = ExecutionStatus.FAILED
+        running.complete()
+        assert project.get_active_execution() is None
+
+def test_json_provider_options(tmp_path):
+    """app.json accepts int keys and honours the stdlib keyword arguments"""
+    app = _make_sqlite_app(tmp_path / 'json.db')
+    assert app.json.loads(app.json.dumps({1: 'a'})) == {'1': 'a'}
+    assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+    assert app.json.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
+    assert app.json.dumps({'a': object()}, default=lambda o: 'x') == '{"a": "x"}'
+
+def test_sqlite_pragmas_only_on_app_engine(tmp_path):
+    """The PRAGMA hook tunes the app engine and leaves other engines alone"""
+    from sqlalchemy import create_engine
+    
+    app = _make_sqlite_app(tmp_path / 'pragmas.db')
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA foreign_keys').scalar() == 1
+        other = create_engine(db.engine.url)
+        with other.connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA foreign_keys').scalar() == 0
+        other.dispose()
+
+def test_llm_cache_key_covers_prompts(monkeypatch):
+    """Editing an agent prompt changes the generation cache key"""
+    import main
+    from app.tasks import llm_cache
+    
+    provider = main.LLMProvider('simulation')
+    llm_cache._prompts_digest.cache_clear()
+    before = llm_cache.cache_key("topic", 3, provider)
+    
+    build_prompt = main.Agent._build_prompt
+    monkeypatch.setattr(main.Agent, '_build_prompt',
+                        lambda self, task, context=None: build_prompt(self, task, context) + "Seja breve.")
+    llm_cache._prompts_digest.cache_clear()
+    assert llm_cache.cache_key("topic", 3, provider) != before
+    llm_cache._prompts_digest.cache_clear()
+
+def test_login_rehashes_legacy_password(tmp_path):
+    """Logging in with a legacy Werkzeug hash stores an argon2 hash instead"""
+    from werkzeug.security import generate_password_hash
+    
+    app = _make_sqlite_app(tmp_path / 'login.db')
+    with app.app_context():
+        user = User.query.first()
+        user.password_hash = generate_password_hash('secret')
+        db.session.commit()
+        user_id, email = user.id, user.email
+    
+    response = app.test_client().post('/auth/login', data={'email': email, 'password': 'secret'})
+    assert response.status_code == 302
+    
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert user.password_hash.startswith('$argon2id$')
+        assert user.check_password('secret') and not user.check_password('wrong')
+
+def test_wizard_data_shared_between_workers(tmp_path):
+    """Wizard drafts stored by one app instance are read by another (another worker)"""
+    from flask_login import login_user
+    from app.routes import wizard
+    
+    first = _make_sqlite_app(tmp_path / 'wizard.db')
+    second = create_app(_sqlite_config(tmp_path / 'wizard.db'))
+    
+    with first.test_request_context():
+        login_user(User.query.first())
+        wizard._store_wizard_data(None, {'project_title': 'Rascunho'})
+    with second.test_request_context():
+        login_user(User.query.first())
+        assert wizard._load_wizard_data(None) == {'project_title': 'Rascunho'}
+
+def test_progress_throttle_writes_through(tmp_path, monkeypatch):
+    """Progress is visible to other sessions and throttled per execution"""
+    from app.utils import progress_throttle
+    
+    app = _make_sqlite_app(tmp_path / 'progress.db')
+    with app.app_context():
+        execution = _new_execution(Project.query.first())
+        execution_id = execution.id
+        
+        def stored():
+            db.session.remove()
+            return db.session.get(Execution, execution_id).progress
+        
+        monkeypatch.setattr(progress_throttle, 'MIN_INTERVAL', 60)
+        assert progress_throttle.record(execution_id, 0.2)
+        assert stored() == 0.2
+        
+        # Dentro do intervalo só a conclusão é gravada
+        assert not progress_throttle.record(execution_id, 0.5)
+        assert stored() == 0.2
+        assert progress_throttle.record(execution_id, 1.0)
+        assert stored() == 1.0
+        
+        # Execuções finalizadas não são alteradas
+        db.session.get(Execution, execution_id).complete()
+        monkeypatch.setattr(progress_throttle, 'MIN_INTERVAL', 0)
+        progress_throttle.record(execution_id, 0.3)
+        assert stored() == 1.0
+
+def test_progress_throttle_is_bounded(tmp_path, monkeypatch):
+    """The throttle forgets the oldest executions beyond MAX_TRACKED"""
+    from app.utils import progress_throttle
+    
+    app = _make_sqlite_app(tmp_path / 'progress.db')
+    monkeypatch.setattr(progress_throttle, 'MAX_TRACKED', 3)
+    monkeypatch.setattr(progress_throttle, '_last_write', progress_throttle.OrderedDict())
+    with app.app_context():
+        for execution_id in range(1, 11):
+            progress_throttle.record(execution_id, 0.5)
+    assert list(progress_throttle._last_write) == [8, 9, 10]
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+
+def _collect_pages(app, url, next_url):
+    """Follow next_cursor links from ``url`` and return the items of every page"""
+    from flask import template_rendered
+    
+    pages = []
+    def record(sender, template, context, **extra):
+        pages.append(context)
+    
+    client = app.test_client()
+    with app.app_context():
+        _login(client, User.query.first().id)
     
-    # Force SQLite configuration by setting environment variable
-    import os
-    os.environ['DATABASE_URL'] = 'sqlite:///app.db'
+    seen = []
+    with template_rendered.connected_to(record, app):
+        while url:
+            assert client.get(url).status_code == 200
+            context = pages[-1]
+            items = context.get('projects', context.get('executions'))
+            seen.extend(item.id for item in items)
+            url = next_url(context['next_cursor']) if context['next_cursor'] else None
+    return seen, len(pages)
+
+def test_project_list_cursor_same_second(tmp_path):
+    """Projects sharing a timestamp are paged through once each"""
+    app = _make_sqlite_app(tmp_path / 'pages.db')
+    same_second = datetime(2026, 1, 1, 12, 0, 0)
+    with app.app_context():
+        user = User.query.first()
+        Project.query.delete()
+        for i in range(7):
+            stamp = same_second.replace(microsecond=0 if i % 2 else 500000)
+            db.session.add(Project(title=f'Project {i}', user_id=user.id, content={},
+                                   created_at=stamp, updated_at=stamp))
+        db.session.commit()
+        expected = sorted(project.id for project in Project.query.all())
+    
+    for order in ('desc', 'asc'):
+        seen, pages = _collect_pages(
+            app, f'/projects/list?per_page=3&order={order}',
+            lambda cursor: f'/projects/list?per_page=3&order={order}&' + urlencode(cursor))
+        assert sorted(seen) == expected and len(seen) == len(expected)
+        assert pages == 3
+
+def test_project_executions_cursor_same_second(tmp_path):
+    """Executions started in the same second are paged through once each"""
+    app = _make_sqlite_app(tmp_path / 'pages.db')
+    same_second = datetime(2026, 1, 1, 12, 0, 0)
+    with app.app_context():
+        project = Project.query.first()
+        for i in range(7):
+            db.session.add(Execution(project_id=project.id, user_id=project.user_id,
+                                     status=ExecutionStatus.COMPLETED,
+                                     started_at=same_second.replace(microsecond=0 if i % 2 else 250000)))
+        db.session.commit()
+        project_id = project.id
+        expected = sorted(execution.id for execution in Execution.query.all())
+    
+    url = f'/execution/project/{project_id}/executions?per_page=3'
+    seen, pages = _collect_pages(app, url, lambda cursor: url + '&' + urlencode(cursor))
+    assert sorted(seen) == expected and len(seen) == len(expected)
+    assert pages == 3
+
+def test_results_show_latest_run(tmp_path, monkeypatch):
+    """Back-to-back runs are completed properly and the results page shows the newest text"""
+    from app.tasks import content_generation
+    from app.tasks.content_generation import start_content_generation_sync
+    
+    app = _make_sqlite_app(tmp_path / 'results.db')
+    texts = iter(["FIRST TEXT", "SECOND TEXT"])
+    monkeypatch.setenv('LLM_PROVIDER', 'simulation')
+    monkeypatch.setattr(content_generation.AutonoWriteSystem, 'generate_content',
+                        lambda self, topic, max_iterations=None: {'final_content': next(texts)})
+    
+    with app.app_context():
+        project = Project.query.first()
+        project_id, user_id = project.id, project.user_id
+        for _ in range(2):
+            execution = project.create_execution(user_id, start=True)
+            assert start_content_generation_sync(execution.id, project_id)['status'] == 'success'
+        
+        for execution in Execution.query.filter_by(project_id=project_id):
+            assert execution.status == ExecutionStatus.COMPLETED
+            assert execution.completed_at is not None and execution.progress == 1.0
+    
+    client = app.test_client()
+    _login(client, user_id)
+    body = client.get(f'/project/{project_id}/results').get_data(as_text=True)
+    assert "SECOND TEXT" in body and "FIRST TEXT" not in body
+
+def test_generation_commits_start_before_llm_run(tmp_path, monkeypatch):
+    """A queued execution is RUNNING, with its logs, while the pipeline runs"""
+    from app.tasks import content_generation
+    from app.tasks.content_generation import start_content_generation_sync
+    
+    app = _make_sqlite_app(tmp_path / 'start.db')
+    monkeypatch.setenv('LLM_PROVIDER', 'simulation')
+    seen = {}
+    
+    def generate_content(self, topic, max_iterations=None):
+        # Lido por uma conexão separada, como faria o processo web
+        with db.engine.connect() as conn:
+            seen['status'] = conn.scalar(db.select(Execution.status).where(Execution.id == execution_id))
+            seen['logs'] = conn.scalar(db.select(db.func.count()).select_from(ExecutionLog)
+                                       .where(ExecutionLog.execution_id == execution_id))
+        return {'final_content': "TEXT"}
+    monkeypatch.setattr(content_generation.AutonoWriteSystem, 'generate_content', generate_content)
+    
+    with app.app_context():
+        project = Project.query.first()
+        execution_id = _new_execution(project).id
+        assert start_content_generation_sync(execution_id, project.id)['status'] == 'success'
+    
+    assert seen['status'] == ExecutionStatus.RUNNING and seen['logs'] > 0
+
+def test_retry_puts_failed_execution_back_to_running(tmp_path, monkeypatch):
+    """A retried run starts from RUNNING again, so its progress is written"""
+    from app.tasks import content_generation
+    from app.tasks.content_generation import start_content_generation_sync
+    from app.utils import progress_throttle
+    
+    app = _make_sqlite_app(tmp_path / 'retry.db')
+    monkeypatch.setenv('LLM_PROVIDER', 'simulation')
+    monkeypatch.setattr(progress_throttle, 'MIN_INTERVAL', 0)
+    written = []
+    
+    def generate_content(self, topic, max_iterations=None):
+        progress_throttle.record(execution_id, 0.5)
+        with db.engine.connect() as conn:
+            written.append(conn.scalar(db.select(Execution.progress).where(Execution.id == execution_id)))
+        return {'final_content': "TEXT"}
+    monkeypatch.setattr(content_generation.AutonoWriteSystem, 'generate_content', generate_content)
+    
+    with app.app_context():
+        project = Project.query.first()
+        execution = _new_execution(project)
+        execution_id = execution.id
+        # Estado deixado por _mark_failed antes de a tarefa ser repetida
+        execution.status = ExecutionStatus.FAILED
+        db.session.commit()
+        
+        assert start_content_generation_sync(execution_id, project.id)['status'] == 'success'
+    
+    assert written == [0.5]
+
+def test_export_import_keeps_generated_text(tmp_path, monkeypatch):
+    """The generated text survives exporting a project and importing it back"""
+    import io
+    from app.tasks import content_generation
+    from app.tasks.content_generation import start_content_generation_sync
+    
+    app = _make_sqlite_app(tmp_path / 'export.db')
+    monkeypatch.setenv('LLM_PROVIDER', 'simulation')
+    monkeypatch.setattr(content_generation.AutonoWriteSystem, 'generate_content',
+                        lambda self, topic, max_iterations=None: {'final_content': "EXPORTED TEXT"})
+    with app.app_context():
+        project = Project.query.first()
+        project_id, user_id = project.id, project.user_id
+        execution = project.create_execution(user_id, start=True)
+        start_content_generation_sync(execution.id, project_id)
+    
+    client = app.test_client()
+    _login(client, user_id)
+    archive = client.get(f'/projects/projects/{project_id}/export').data
+    client.post('/projects/projects/import', content_type='multipart/form-data',
+                data={'project_file': (io.BytesIO(archive), 'project.zip')})
+    
+    with app.app_context():
+        imported = Project.query.filter(Project.id != project_id).one()
+        imported_id = imported.id
+    body = client.get(f'/project/{imported_id}/results').get_data(as_text=True)
+    assert "EXPORTED TEXT" in body
+
+def _zip_upload(members):
+    import io
+    from zipfile import ZipFile, ZIP_DEFLATED
+    
+    buf = io.BytesIO()
+    with ZipFile(buf, 'w', ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buf.seek(0)
+    return {'project_file': (buf, 'project.zip')}
+
+def test_import_rejects_oversized_members(tmp_path, monkeypatch):
+    """Oversized ZIP members are refused from the directory sizes, before any read"""
+    from zipfile import ZipFile
+    from app.routes import projects
+    
+    app = _make_sqlite_app(tmp_path / 'import.db')
+    monkeypatch.setattr(projects, 'MAX_IMPORT_JSON_SIZE', 1_000)
+    monkeypatch.setattr(projects, 'MAX_IMPORT_TOTAL_SIZE', 10_000)
+    monkeypatch.setattr(projects, 'MAX_IMPORT_RATIO', 10)
+    
+    def no_read(*args, **kwargs):
+        raise AssertionError('member opened before the size checks')
+    
+    project_json = json.dumps({'title': 'Imported'}).encode()
+    oversized = (
+        {'project.json': b' ' * 2_000 + project_json},                        # project.json
+        {'project.json': project_json, 'padding.bin': b'x' * 20_000},       # total
+        {'project.json': project_json + b' ' * 900},                         # compression ratio
+    )
+    client = app.test_client()
+    with app.app_context():
+        _login(client, User.query.first().id)
+        projects_before = Project.query.count()
+    
+    uploads = [_zip_upload(members) for members in oversized]
+    monkeypatch.setattr(ZipFile, 'open', no_read)
+    for upload in uploads:
+        client.post('/projects/projects/import', data=upload,
+                    content_type='multipart/form-data')
+        with client.session_transaction() as sess:
+            assert sess.pop('_flashes') == [('error', 'Arquivo de projeto grande demais')]
+    
+    with app.app_context():
+        assert Project.query.count() == projects_before
+
+def test_execution_system(tmp_path=None):
+    """Test the execution system with a sample project"""
     
-    # Create app with SQLite configuration
-    app = create_app()
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Temporary SQLite database, never the repository's app.db
+    if tmp_path is None:
+        import tempfile
+        from pathlib import Path
+        tmp_path = Path(tempfile.mkdtemp())
+    app = _make_sqlite_app(tmp_path / 'execution.db')
     
     with app.app_context():
         try: